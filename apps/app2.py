@@ -30,8 +30,6 @@ from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 from typing import Any, Dict, List, Optional, Tuple
 
-import streamlit as st
-
 
 # --------------------------- Fixed parameter mapping ---------------------------
 
@@ -72,6 +70,12 @@ PARAMETERS: List[ParameterSpec] = [
     ParameterSpec(12016, "moisture", "other"),
 ]
 
+# Column views of PARAMETERS (same order), so the per-rerun loops read plain tuples
+# instead of going through dataclass attribute lookups.
+_PARAM_IDS: Tuple[int, ...] = tuple(p.parametertype_id for p in PARAMETERS)
+_PARAM_NAMES: Tuple[str, ...] = tuple(p.name for p in PARAMETERS)
+_PARAM_GROUPS: Tuple[str, ...] = tuple(p.group for p in PARAMETERS)
+
 LOCKED_UNIT: str = "g/100g"
 
 # “Other parameters” set (exactly as you listed)
@@ -86,6 +90,23 @@ SODIUM_LIKE_IDS: set[int] = {5299, 5445, 5446}
 
 Q4 = Decimal("0.0001")
 
+# Decimal literals used by the deviation rules, parsed once at import.
+_D_0 = Decimal("0")
+_D_20PCT = Decimal("0.20")
+_D_10 = Decimal("10")
+_D_40 = Decimal("40")
+_D_50 = Decimal("50")
+_D_100 = Decimal("100")
+_D_0_15 = Decimal("0.15")
+_D_0_375 = Decimal("0.375")
+_D_0_5 = Decimal("0.5")
+_D_0_8 = Decimal("0.8")
+_D_1_25 = Decimal("1.25")
+_D_1_5 = Decimal("1.5")
+_D_2 = Decimal("2")
+_D_4 = Decimal("4")
+_D_8 = Decimal("8")
+
 
 def q4(x: Decimal) -> Decimal:
     """Quantize to 4dp with half-up rounding."""
@@ -98,7 +119,7 @@ def dec_from_floatish(x: Decimal) -> Decimal:
 
 
 def clamp_lower_to_zero(x: Decimal) -> Decimal:
-    return x if x >= Decimal("0") else Decimal("0")
+    return x if x >= _D_0 else _D_0
 
 
 # --------------------------- Parsing numeric inputs ---------------------------
@@ -114,6 +135,32 @@ class ParsedNumber:
 _UNIT_RE = re.compile(r"^\s*([+-]?[0-9][0-9.,\s]*)\s*([A-Za-zµ/%]+)?\s*$")
 
 
+def _normalize_separators(num_part: str) -> str:
+    """
+    Resolve thousands/decimal separators from the separator positions alone (no extra regex passes).
+    A lone separator followed by exactly 3 trailing digits is treated as thousands.
+    """
+    dot_i = num_part.find(".")
+    comma_i = num_part.find(",")
+    if dot_i >= 0 and comma_i >= 0:
+        if dot_i < comma_i:
+            # EU: '.' thousands, ',' decimal
+            return num_part.replace(".", "").replace(",", ".")
+        # US: ',' thousands, '.' decimal
+        return num_part.replace(",", "")
+
+    sep_i = dot_i if dot_i >= 0 else comma_i
+    if sep_i < 0:
+        return num_part
+
+    sep = num_part[sep_i]
+    n = len(num_part)
+    if n >= 4 and num_part[n - 4] == sep and num_part[n - 3:].isdigit():
+        return num_part.replace(sep, "")
+    # decimal separator ('.' kept as-is, ',' -> '.')
+    return num_part.replace(",", ".")
+
+
 def parse_number_with_locale_and_unit(raw: str) -> ParsedNumber:
     """
     Parse a numeric string that may contain thousands/decimal separators and optional unit text.
@@ -141,31 +188,7 @@ def parse_number_with_locale_and_unit(raw: str) -> ParsedNumber:
     unit_part = m.group(2)
     had_unit_text = unit_part is not None and unit_part.strip() != ""
 
-    # Normalize separators
-    if "." in num_part and "," in num_part:
-        dot_i = num_part.find(".")
-        comma_i = num_part.find(",")
-        if dot_i < comma_i:
-            # EU: '.' thousands, ',' decimal
-            normalized = num_part.replace(".", "").replace(",", ".")
-        else:
-            # US: ',' thousands, '.' decimal
-            normalized = num_part.replace(",", "")
-    elif "." in num_part:
-        # If dot followed by exactly 3 digits at end -> thousands
-        if re.search(r"\.\d{3}$", num_part):
-            normalized = num_part.replace(".", "")
-        else:
-            normalized = num_part
-    elif "," in num_part:
-        # If comma followed by exactly 3 digits at end -> thousands
-        if re.search(r",\d{3}$", num_part):
-            normalized = num_part.replace(",", "")
-        else:
-            # decimal comma
-            normalized = num_part.replace(",", ".")
-    else:
-        normalized = num_part
+    normalized = _normalize_separators(num_part)
 
     try:
         val = Decimal(normalized)
@@ -178,7 +201,7 @@ def parse_number_with_locale_and_unit(raw: str) -> ParsedNumber:
 # --------------------------- Deviation rules ---------------------------
 
 def deviation_energy(target: Decimal) -> Decimal:
-    return q4(target * Decimal("0.20"))
+    return q4(target * _D_20PCT)
 
 
 def deviation_piecewise_10_40(target: Decimal, low_abs: Decimal, high_abs: Decimal) -> Decimal:
@@ -187,10 +210,10 @@ def deviation_piecewise_10_40(target: Decimal, low_abs: Decimal, high_abs: Decim
     10..40 inclusive -> ±20% of target
     >40 -> ±high_abs
     """
-    if target < Decimal("10"):
+    if target < _D_10:
         return q4(low_abs)
-    if target <= Decimal("40"):
-        return q4(target * Decimal("0.20"))
+    if target <= _D_40:
+        return q4(target * _D_20PCT)
     return q4(high_abs)
 
 
@@ -198,11 +221,11 @@ def deviation_saturated_like(target: Decimal, threshold: Decimal, low_abs: Decim
     """<threshold -> ±low_abs else ±20%."""
     if target < threshold:
         return q4(low_abs)
-    return q4(target * Decimal("0.20"))
+    return q4(target * _D_20PCT)
 
 
 def deviation_percent(target: Decimal, percent: Decimal) -> Decimal:
-    return q4(target * (percent / Decimal("100")))
+    return q4(target * (percent / _D_100))
 
 
 def compute_bounds(target: Decimal, dev: Decimal) -> Tuple[Decimal, Decimal]:
@@ -217,7 +240,7 @@ def rule_row(
     *,
     spec_id: int,
     parametertype_id: int,
-    ddf_target_value: Optional[Decimal],
+    ddf_target_value: Optional[float],
     ddf_unit: Optional[str],
     ddf_type: str,
     color: str,
@@ -228,13 +251,13 @@ def rule_row(
     value2: Optional[Any],
 ) -> Dict[str, Any]:
     """
-    Build one rule entry. Numeric fields are emitted as JSON numbers by using float() conversion
-    after quantization; special empty-string sentinel for `value` remains a string exactly '""'.
+    Build one rule entry. Numeric fields are expected as already-quantized floats so they are emitted
+    as JSON numbers; special empty-string sentinel for `value` remains a string exactly '""'.
     """
     data: Dict[str, Any] = {
         "color": color,
         "column": 0,
-        "DDF_target_value": (float(q4(ddf_target_value)) if ddf_target_value is not None else None),
+        "DDF_target_value": ddf_target_value,
         "DDF_type": ddf_type,
         "DDF_unit": (ddf_unit if (ddf_unit is not None and str(ddf_unit).strip() != "") else None),
         "inverse": 0,
@@ -253,6 +276,31 @@ def rule_row(
     return {"action": "create", "data": data}
 
 
+# Blank-target rule: everything is fixed except spec_id, parametertype_id and DDF_unit.
+_EMPTY_PERFECT_DATA: Dict[str, Any] = rule_row(
+    spec_id=0,
+    parametertype_id=0,
+    ddf_target_value=None,
+    ddf_unit=None,
+    ddf_type="perfect",
+    color="green",
+    operator="!=",
+    value='""',         # critical: literal two quotes as a string
+    linker=None,
+    operator2=None,
+    value2=None,
+)["data"]
+
+
+def empty_target_rule(*, spec_id: int, parametertype_id: int, ddf_unit: Optional[str]) -> Dict[str, Any]:
+    """Copy of the blank-target perfect rule (`operator !=`, `value '""'`) with the varying fields patched in."""
+    data = _EMPTY_PERFECT_DATA.copy()
+    data["spec_id"] = spec_id
+    data["parametertype_id"] = parametertype_id
+    data["DDF_unit"] = ddf_unit if (ddf_unit is not None and str(ddf_unit).strip() != "") else None
+    return {"action": "create", "data": data}
+
+
 def build_rules_payload(
     *,
     spec_id: int,
@@ -266,27 +314,13 @@ def build_rules_payload(
     warnings: List[str] = []
     rules: List[Dict[str, Any]] = []
 
-    for p in PARAMETERS:
-        target = per_param_target.get(p.parametertype_id)
-        unit = per_param_unit.get(p.parametertype_id)
+    for pid, name, group in zip(_PARAM_IDS, _PARAM_NAMES, _PARAM_GROUPS):
+        target = per_param_target.get(pid)
+        unit = per_param_unit.get(pid)
 
         # Empty target => only perfect != rule with value='""'
         if target is None:
-            rules.append(
-                rule_row(
-                    spec_id=spec_id,
-                    parametertype_id=p.parametertype_id,
-                    ddf_target_value=None,
-                    ddf_unit=unit,
-                    ddf_type="perfect",
-                    color="green",
-                    operator="!=",
-                    value='""',         # critical: literal two quotes as a string
-                    linker=None,
-                    operator2=None,
-                    value2=None,
-                )
-            )
+            rules.append(empty_target_rule(spec_id=spec_id, parametertype_id=pid, ddf_unit=unit))
             continue
 
         # Target exists: compute bounds based on parameter rules
@@ -294,88 +328,148 @@ def build_rules_payload(
         dev: Optional[Decimal] = None
 
         # Locked main parameters always use g/100g rules
-        if p.group == "locked":
-            if p.parametertype_id in (11709, 11710):  # energy kJ/kcal
+        if group == "locked":
+            if pid in (11709, 11710):  # energy kJ/kcal
                 dev = deviation_energy(target)
-            elif p.parametertype_id == 5239:  # fat total
-                dev = deviation_piecewise_10_40(target, low_abs=Decimal("1.5"), high_abs=Decimal("8"))
-            elif p.parametertype_id == 5444:  # saturated fat
-                dev = deviation_saturated_like(target, threshold=Decimal("4"), low_abs=Decimal("0.8"))
-            elif p.parametertype_id in (5244, 5245, 5252, 11423, 11940):  # carbs/sugar/fibre/protein
-                dev = deviation_piecewise_10_40(target, low_abs=Decimal("2"), high_abs=Decimal("8"))
-            elif p.parametertype_id == 11440:  # salt
-                dev = deviation_saturated_like(target, threshold=Decimal("1.25"), low_abs=Decimal("0.375"))
+            elif pid == 5239:  # fat total
+                dev = deviation_piecewise_10_40(target, low_abs=_D_1_5, high_abs=_D_8)
+            elif pid == 5444:  # saturated fat
+                dev = deviation_saturated_like(target, threshold=_D_4, low_abs=_D_0_8)
+            elif pid in (5244, 5245, 5252, 11423, 11940):  # carbs/sugar/fibre/protein
+                dev = deviation_piecewise_10_40(target, low_abs=_D_2, high_abs=_D_8)
+            elif pid == 11440:  # salt
+                dev = deviation_saturated_like(target, threshold=_D_1_25, low_abs=_D_0_375)
             else:
                 # Should not happen, but fall back to 20%
-                dev = q4(target * Decimal("0.20"))
+                dev = q4(target * _D_20PCT)
 
-        elif p.group == "sodium_like":
+        elif group == "sodium_like":
             # If unit is g/100g, use piecewise; else require deviation%
             if (unit or "").strip() == LOCKED_UNIT:
-                if p.parametertype_id == 5299:  # sodium
-                    dev = deviation_saturated_like(target, threshold=Decimal("0.5"), low_abs=Decimal("0.15"))
+                if pid == 5299:  # sodium
+                    dev = deviation_saturated_like(target, threshold=_D_0_5, low_abs=_D_0_15)
                 else:
                     # mono/poly like saturated fat rule
-                    dev = deviation_saturated_like(target, threshold=Decimal("4"), low_abs=Decimal("0.8"))
+                    dev = deviation_saturated_like(target, threshold=_D_4, low_abs=_D_0_8)
             else:
-                perc = per_param_deviation_percent.get(p.parametertype_id)
+                perc = per_param_deviation_percent.get(pid)
                 if perc is None:
                     warnings.append(
-                        f"{p.name}: unit is not '{LOCKED_UNIT}', so deviation% is required. Defaulted to 10%."
+                        f"{name}: unit is not '{LOCKED_UNIT}', so deviation% is required. Defaulted to 10%."
                     )
-                    perc = Decimal("10")
+                    perc = _D_10
                 dev = deviation_percent(target, perc)
 
         else:
             # other parameters
-            perc = per_param_deviation_percent.get(p.parametertype_id)
+            perc = per_param_deviation_percent.get(pid)
             if perc is None:
-                warnings.append(f"{p.name}: deviation% not provided. Defaulted to 10%.")
-                perc = Decimal("10")
+                warnings.append(f"{name}: deviation% not provided. Defaulted to 10%.")
+                perc = _D_10
             dev = deviation_percent(target, perc)
 
         # Compute bounds and clamp
         lower, upper = compute_bounds(target, dev)
+        target_f, lower_f, upper_f = float(q4(target)), float(lower), float(upper)
 
         # Perfect
         rules.append(
             rule_row(
                 spec_id=spec_id,
-                parametertype_id=p.parametertype_id,
-                ddf_target_value=target,
+                parametertype_id=pid,
+                ddf_target_value=target_f,
                 ddf_unit=unit,
                 ddf_type="perfect",
                 color="green",
                 operator=">=",
-                value=float(lower),
+                value=lower_f,
                 linker="AND",
                 operator2="<=",
-                value2=float(upper),
+                value2=upper_f,
             )
         )
         # Not OK
         rules.append(
             rule_row(
                 spec_id=spec_id,
-                parametertype_id=p.parametertype_id,
-                ddf_target_value=target,
+                parametertype_id=pid,
+                ddf_target_value=target_f,
                 ddf_unit=unit,
                 ddf_type="not OK",
                 color="red",
                 operator="<",
-                value=float(lower),
+                value=lower_f,
                 linker="OR",
                 operator2=">",
-                value2=float(upper),
+                value2=upper_f,
             )
         )
 
     return {"rules": rules}, warnings
 
 
+# --------------------------- JSON encoding ---------------------------
+
+_encode_json_str = json.encoder.encode_basestring  # ensure_ascii=False string escaping
+
+
+def _json_scalar(v: Any) -> str:
+    if v is None:
+        return "null"
+    if isinstance(v, str):
+        return _encode_json_str(v)
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    return repr(v)  # int/float: same text json.dumps emits
+
+
+def encode_rules_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode {"rules": [...]} exactly like json.dumps(payload, ensure_ascii=False, indent=2).
+
+    The payload shape is fixed (action + flat data dict of scalars), so rules are appended
+    straight into one buffer instead of walking the generic pure-Python indent encoder.
+    """
+    rules = payload["rules"]
+    if not rules:
+        return b'{\n  "rules": []\n}'
+
+    buf = bytearray(b'{\n  "rules": [\n')
+    last = len(rules) - 1
+    for i, item in enumerate(rules):
+        fields = ",\n".join(
+            f"        {_encode_json_str(k)}: {_json_scalar(v)}" for k, v in item["data"].items()
+        )
+        buf += (
+            f'    {{\n      "action": {_encode_json_str(item["action"])},\n      "data": {{\n'
+            f"{fields}\n      }}\n    }}{',' if i < last else ''}\n"
+        ).encode("utf-8")
+    buf += b"  ]\n}"
+    return bytes(buf)
+
+
 # --------------------------- Streamlit UI ---------------------------
 
+# Preview column label -> rule `data` key, in display order.
+_PREVIEW_COLUMNS: Dict[str, str] = {
+    "parametertype_id": "parametertype_id",
+    "DDF_type": "DDF_type",
+    "unit": "DDF_unit",
+    "target": "DDF_target_value",
+    "operator": "operator",
+    "value": "value",
+    "linker": "linker",
+    "operator2": "operator2",
+    "value2": "value2",
+    "color": "color",
+}
+
+
 def main() -> None:
+    # Imported here so the rule builders/parsers above can be reused without loading Streamlit.
+    import pandas as pd
+    import streamlit as st
+
     st.set_page_config(page_title="Nutri Rules Generator", layout="wide")
     st.title("Nutri Rules Generator")
     st.caption("Generate Apps Script–compatible Rules JSON for nutrition specs (Rules first).")
@@ -425,14 +519,14 @@ def main() -> None:
     header_cols[2].markdown("**Unit**")
     header_cols[3].markdown("**Deviation %**")
 
-    for p in PARAMETERS:
+    for pid, name, group in zip(_PARAM_IDS, _PARAM_NAMES, _PARAM_GROUPS):
         cols = st.columns([4, 1.5, 1.5, 1.5])
 
-        cols[0].write(f"{p.name}  \n`{p.parametertype_id}`")
+        cols[0].write(f"{name}  \n`{pid}`")
 
-        target_key = f"target_{p.parametertype_id}"
-        unit_key = f"unit_{p.parametertype_id}"
-        dev_key = f"dev_{p.parametertype_id}"
+        target_key = f"target_{pid}"
+        unit_key = f"unit_{pid}"
+        dev_key = f"dev_{pid}"
 
         raw_target = cols[1].text_input(
             label="",
@@ -442,11 +536,11 @@ def main() -> None:
         )
 
         # Unit field logic
-        if p.group == "locked":
+        if group == "locked":
             # locked unit
             unit_val = LOCKED_UNIT
             cols[2].write(LOCKED_UNIT)
-        elif p.group == "sodium_like":
+        elif group == "sodium_like":
             # allow unit selection + custom
             unit_choice = cols[2].selectbox(
                 label="",
@@ -477,35 +571,35 @@ def main() -> None:
         if parsed.error:
             # If they typed something non-empty but unparsable, record error
             if raw_target.strip() != "":
-                parse_errors.append(f"{p.name}: {parsed.error} (input: {raw_target})")
-            per_param_target[p.parametertype_id] = None
+                parse_errors.append(f"{name}: {parsed.error} (input: {raw_target})")
+            per_param_target[pid] = None
         else:
-            per_param_target[p.parametertype_id] = parsed.value
+            per_param_target[pid] = parsed.value
 
         # If unit text was present in target and this is locked-unit parameter, show note
-        if parsed.had_unit_text and p.group == "locked":
-            input_notes.append(f"{p.name}: unit text was removed from target. Note: units must be {LOCKED_UNIT}.")
+        if parsed.had_unit_text and group == "locked":
+            input_notes.append(f"{name}: unit text was removed from target. Note: units must be {LOCKED_UNIT}.")
 
         # If unit text was present and unit is empty on non-locked params, suggest using extracted unit.
         # (We don't auto-mutate the unit field to avoid confusing reruns.)
-        if parsed.had_unit_text and p.group != "locked" and (unit_val is None or str(unit_val).strip() == ""):
+        if parsed.had_unit_text and group != "locked" and (unit_val is None or str(unit_val).strip() == ""):
             if parsed.extracted_unit:
                 input_notes.append(
-                    f"{p.name}: detected unit '{parsed.extracted_unit}' in target input. "
+                    f"{name}: detected unit '{parsed.extracted_unit}' in target input. "
                     f"Consider entering it in the Unit field."
                 )
 
         # Save unit
-        per_param_unit[p.parametertype_id] = (unit_val.strip() if isinstance(unit_val, str) and unit_val.strip() != "" else unit_val)
+        per_param_unit[pid] = (unit_val.strip() if isinstance(unit_val, str) and unit_val.strip() != "" else unit_val)
 
         # Deviation% UI: shown only if needed
         needs_dev = False
-        if p.parametertype_id in OTHER_PARAM_IDS:
+        if pid in OTHER_PARAM_IDS:
             needs_dev = True
-        if p.parametertype_id in SODIUM_LIKE_IDS and (per_param_unit[p.parametertype_id] or "").strip() != LOCKED_UNIT:
+        if pid in SODIUM_LIKE_IDS and (per_param_unit[pid] or "").strip() != LOCKED_UNIT:
             needs_dev = True
 
-        if needs_dev and per_param_target[p.parametertype_id] is not None:
+        if needs_dev and per_param_target[pid] is not None:
             # Accept 0..50
             dev_str = cols[3].text_input(
                 label="",
@@ -515,24 +609,24 @@ def main() -> None:
             )
             dev_str = (dev_str or "").strip()
             if dev_str == "":
-                per_param_dev[p.parametertype_id] = None
+                per_param_dev[pid] = None
                 cols[3].markdown("<div style='margin-top:6px;'>%</div>", unsafe_allow_html=True)
             else:
                 try:
                     dev_val = Decimal(dev_str)
-                    if dev_val < Decimal("0") or dev_val > Decimal("50"):
-                        parse_errors.append(f"{p.name}: deviation% must be between 0 and 50.")
-                        per_param_dev[p.parametertype_id] = None
+                    if dev_val < _D_0 or dev_val > _D_50:
+                        parse_errors.append(f"{name}: deviation% must be between 0 and 50.")
+                        per_param_dev[pid] = None
                     else:
-                        per_param_dev[p.parametertype_id] = dev_val
+                        per_param_dev[pid] = dev_val
                     cols[3].markdown("<div style='margin-top:6px;'>%</div>", unsafe_allow_html=True)
                 except Exception:
-                    parse_errors.append(f"{p.name}: deviation% is not a valid number.")
-                    per_param_dev[p.parametertype_id] = None
+                    parse_errors.append(f"{name}: deviation% is not a valid number.")
+                    per_param_dev[pid] = None
                     cols[3].markdown("<div style='margin-top:6px;'>%</div>", unsafe_allow_html=True)
         else:
             cols[3].write("—")
-            per_param_dev[p.parametertype_id] = None
+            per_param_dev[pid] = None
 
     if input_notes:
         st.warning("\n".join(input_notes))
@@ -560,29 +654,17 @@ def main() -> None:
         # Preview
         if show_preview:
             st.markdown("### Preview (computed bounds)")
-            preview_rows: List[Dict[str, Any]] = []
-            for item in payload["rules"]:
-                d = item["data"]
-                preview_rows.append(
-                    {
-                        "parametertype_id": d["parametertype_id"],
-                        "DDF_type": d["DDF_type"],
-                        "unit": d["DDF_unit"],
-                        "target": d["DDF_target_value"],
-                        "operator": d["operator"],
-                        "value": d["value"],
-                        "linker": d["linker"],
-                        "operator2": d["operator2"],
-                        "value2": d["value2"],
-                        "color": d["color"],
-                    }
-                )
-            st.dataframe(preview_rows, use_container_width=True, height=420)
+            preview_df = pd.DataFrame.from_records(
+                (item["data"] for item in payload["rules"]),
+                columns=list(_PREVIEW_COLUMNS.values()),
+            )
+            preview_df.columns = list(_PREVIEW_COLUMNS)
+            st.dataframe(preview_df, use_container_width=True, height=420)
 
         # Download
         now = datetime.now()
         fname = f"{file_prefix}_{spec_id}_{now.strftime('%Y%m%d_%H%M')}.json"
-        json_bytes = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        json_bytes = encode_rules_payload(payload)
 
         st.download_button(
             label="Download Rules JSON",
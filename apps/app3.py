@@ -12,114 +12,121 @@ Rules are generated Apps Script / LIMS compatible.
 
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import streamlit as st
+from exim_rules_core import (
+    EMITTERS,
+    MODE_LABELS,
+    MODE_LOWER_ONLY,
+    MODE_LOWER_UPPER,
+    PARAMS,
+    Param,
+    parse_float,
+    payload_json_bytes,
+    q4f,
+)
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-# ----------------------------- Constants -----------------------------
 
-MODE_LOWER_ONLY: str = "lower"
-MODE_DUMMY: str = "dummy"
-MODE_LOWER_UPPER: str = "lower_upper"
+# ----------------------------- Streamlit UI -----------------------------
 
-MODE_LABELS: Dict[str, str] = {
-    MODE_LOWER_ONLY: "Lower bound only",
-    MODE_DUMMY: "Dummy mode",
-    MODE_LOWER_UPPER: "Lower / upper bound",
+# Preview column label -> rule `data` key, in display order.
+_PREVIEW_COLUMNS: Dict[str, str] = {
+    "param_id": "parametertype_id",
+    "type": "DDF_type",
+    "operator": "operator",
+    "value": "value",
+    "linker": "linker",
+    "operator2": "operator2",
+    "value2": "value2",
+    "unit": "DDF_unit",
 }
 
-Q4 = Decimal("0.0001")
-
-
-def q4(x: Decimal) -> Decimal:
-    return x.quantize(Q4, rounding=ROUND_HALF_UP)
-
-
-# ----------------------------- Parameters -----------------------------
-
-@dataclass(frozen=True)
-class Param:
-    id: int
-    name: str
-    kind: str  # density | moisture | mesh
-    default_unit: Optional[str]
-
-
-PARAMS: List[Param] = [
-    Param(11194, "Bulk Density", "density", "g/cm3"),
-    Param(11196, "Moisture content analysis", "moisture", "%"),
-    Param(11974, "Tapped Density", "density", "g/cm3"),
-    Param(11975, "Mesh Size", "mesh", "%"),
-    Param(12029, "Mesh Size 20", "mesh", "%"),
-    Param(12030, "Mesh Size 40", "mesh", "%"),
-    Param(12031, "Mesh Size 60", "mesh", "%"),
-    Param(12032, "Mesh Size 80", "mesh", "%"),
-    Param(12033, "Mesh Size 100", "mesh", "%"),
-]
-
-DENSITY_IDS = {11194, 11974}
-
-
-# ----------------------------- Payload helpers -----------------------------
-
-def rule(
-    *,
-    spec_id: int,
-    param_id: int,
-    ddf_type: str,
-    color: str,
-    operator: str,
-    value: Any,
-    linker: Optional[str],
-    operator2: Optional[str],
-    value2: Optional[Any],
-    target: Optional[Decimal],
-    unit: Optional[str],
-) -> Dict[str, Any]:
-    return {
-        "action": "create",
-        "data": {
-            "color": color,
-            "column": 0,
-            "DDF_target_value": float(q4(target)) if target is not None else None,
-            "DDF_type": ddf_type,
-            "DDF_unit": unit if unit else None,
-            "inverse": 0,
-            "linker": linker,
-            "operator": operator,
-            "operator2": operator2,
-            "parametertype_id": param_id,
-            "regex_filter": None,
-            "show": 1,
-            "spec_id": spec_id,
-            "text": None,
-            "translations": None,
-            "value": value,
-            "value2": value2,
-        },
-    }
 
+# Editor column names, in display order.
+_COL_NAME = "Parameter"
+_COL_ID = "ID"
+_COL_MODE = "Mode"
+_COL_TARGET = "Target / Lower"
+_COL_UPPER = "Upper"
+_COL_UNIT = "Unit"
+
+# The Mode column holds the human-readable labels; map them back to mode keys.
+_MODE_BY_LABEL: Dict[str, str] = {label: mode for mode, label in MODE_LABELS.items()}
+
+
+def _initial_table() -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            _COL_NAME: [p.name for p in PARAMS],
+            _COL_ID: [p.id for p in PARAMS],
+            _COL_MODE: [MODE_LABELS[MODE_LOWER_ONLY]] * len(PARAMS),
+            _COL_TARGET: [""] * len(PARAMS),
+            _COL_UPPER: [""] * len(PARAMS),
+            _COL_UNIT: [p.default_unit or "" for p in PARAMS],
+        }
+    )
+
+
+def _collect_row(
+    p: Param,
+    mode: str,
+    t_raw: Optional[str],
+    u_raw: Optional[str],
+    unit_raw: Optional[str],
+    warnings: List[str],
+) -> Tuple[str, Optional[float], Optional[float], Optional[str]]:
+    """Validate one edited row and return (mode, target_q, upper_q, unit); problems go to `warnings`."""
+    # Lower / upper bound is density only; the editor can't restrict options per row, so check here.
+    if mode == MODE_LOWER_UPPER and not p.is_density:
+        warnings.append(f"{p.name}: {MODE_LABELS[MODE_LOWER_UPPER]} is only available for density parameters — no rules generated")
+        # nothing is emitted for this row, so don't parse (or warn about) its values
+        return mode, None, None, (unit_raw or "").strip() or None
+
+    # numeric fields (Upper is only read in lower/upper mode, neither in dummy mode)
+    target_val: Optional[float] = None
+    upper_val: Optional[float] = None
+
+    if mode == MODE_LOWER_ONLY:
+        target_val = parse_float(t_raw)
+    elif mode == MODE_LOWER_UPPER:
+        target_val = parse_float(t_raw)
+        upper_val = parse_float(u_raw)
+
+    # clamp negatives (and warn)
+    if target_val is not None and target_val < 0.0:
+        target_val = 0.0
+        warnings.append(f"{p.name}: lower/target was negative and was clamped to 0")
+
+    if upper_val is not None and upper_val < 0.0:
+        upper_val = 0.0
+        warnings.append(f"{p.name}: upper bound was negative and was clamped to 0")
+
+    # auto-swap for lower/upper mode (and warn)
+    if mode == MODE_LOWER_UPPER and target_val is not None and upper_val is not None:
+        if target_val >= upper_val:
+            target_val, upper_val = upper_val, target_val
+            warnings.append(f"{p.name}: lower ≥ upper — values were auto-swapped")
+
+    unit = (unit_raw or "").strip() or None
+
+    # round once; shared by value/value2/DDF_target_value of every rule emitted for this row
+    tq = q4f(target_val) if target_val is not None else None
+    uq = q4f(upper_val) if upper_val is not None else None
+    return mode, tq, uq, unit
 
-# ----------------------------- Numeric parsing -----------------------------
 
-def parse_decimal(s: str) -> Optional[Decimal]:
-    s = (s or "").strip()
-    if s == "" or s.lower() == "null":
-        return None
-    try:
-        return Decimal(s)
-    except InvalidOperation:
-        return None
+def main() -> None:
+    # Imported here so the row validation above can be reused without loading Streamlit/pandas.
+    from datetime import datetime
 
+    import pandas as pd
+    import streamlit as st
 
-# ----------------------------- Streamlit UI -----------------------------
-
-def main() -> None:
     st.set_page_config(page_title="Exim Int Lab Rules Generator", layout="wide")
     st.title("Exim Int Lab — Rules Generator")
 
@@ -133,265 +140,74 @@ def main() -> None:
     spec_id: Optional[int] = None
     if spec_raw.strip():
         try:
-            spec_id = int(float(spec_raw.strip()))
-        except Exception:
+            spec_id = int(spec_raw.strip())
+        except ValueError:
             st.error("spec_id must be an integer")
 
     st.markdown("### Parameters")
 
-    headers = st.columns([3, 1.5, 1.3, 1.3, 1.2])
-    headers[0].markdown("**Parameter**")
-    headers[1].markdown("**Mode**")
-    headers[2].markdown("**Target / Lower**")
-    headers[3].markdown("**Upper**")
-    headers[4].markdown("**Unit**")
-
-    # collected inputs
-    modes: Dict[int, str] = {}
-    targets: Dict[int, Optional[Decimal]] = {}
-    uppers: Dict[int, Optional[Decimal]] = {}
-    units: Dict[int, Optional[str]] = {}
+    st.caption(
+        f"{MODE_LABELS[MODE_LOWER_UPPER]} is available for density parameters only; "
+        "Upper is ignored in the other modes."
+    )
+
+    # One editor widget for the whole parameter table instead of a grid of per-cell widgets.
+    edited = st.data_editor(
+        _initial_table(),
+        key="params",
+        hide_index=True,
+        num_rows="fixed",
+        disabled=[_COL_NAME, _COL_ID],
+        use_container_width=True,
+        column_config={
+            _COL_ID: st.column_config.NumberColumn(format="%d"),
+            _COL_MODE: st.column_config.SelectboxColumn(options=list(_MODE_BY_LABEL), required=True),
+            _COL_TARGET: st.column_config.TextColumn(),
+            _COL_UPPER: st.column_config.TextColumn(),
+            _COL_UNIT: st.column_config.TextColumn(),
+        },
+    )
 
+    # collected inputs, one (param, mode, target_q, upper_q, unit) record per row
+    collected: List[Tuple[Param, str, Optional[float], Optional[float], Optional[str]]] = []
     warnings: List[str] = []
 
-    for p in PARAMS:
-        cols = st.columns([3, 1.5, 1.3, 1.3, 1.2])
-
-        cols[0].write(f"{p.name}\n`{p.id}`")
-
-        # Mode selector:
-        # - density params: can choose among all 3
-        # - others: only Lower bound only or Dummy mode (no Upper bound mode)
-        if p.id in DENSITY_IDS:
-            mode_options = [MODE_LOWER_ONLY, MODE_DUMMY, MODE_LOWER_UPPER]
-        else:
-            mode_options = [MODE_LOWER_ONLY, MODE_DUMMY]
-
-        mode = cols[1].selectbox(
-            "",
-            options=mode_options,
-            format_func=lambda k: MODE_LABELS[k],
-            key=f"mode_{p.id}",
-        )
-        modes[p.id] = mode
-
-        # numeric fields
-        target_val: Optional[Decimal] = None
-        upper_val: Optional[Decimal] = None
-
-        if mode == MODE_DUMMY:
-            cols[2].write("—")
-            cols[3].write("—")
-        elif mode == MODE_LOWER_ONLY:
-            t_raw = cols[2].text_input("", key=f"t_{p.id}")
-            target_val = parse_decimal(t_raw)
-            cols[3].write("—")
-        elif mode == MODE_LOWER_UPPER:
-            t_raw = cols[2].text_input("", key=f"l_{p.id}")
-            u_raw = cols[3].text_input("", key=f"u_{p.id}")
-            target_val = parse_decimal(t_raw)
-            upper_val = parse_decimal(u_raw)
-        else:
-            raise RuntimeError(f"Unknown mode: {mode}")
-
-        # clamp negatives (and warn)
-        if target_val is not None and target_val < 0:
-            target_val = Decimal("0")
-            warnings.append(f"{p.name}: lower/target was negative and was clamped to 0")
-
-        if upper_val is not None and upper_val < 0:
-            upper_val = Decimal("0")
-            warnings.append(f"{p.name}: upper bound was negative and was clamped to 0")
-
-        # auto-swap for lower/upper mode (and warn)
-        if mode == MODE_LOWER_UPPER and target_val is not None and upper_val is not None:
-            if target_val >= upper_val:
-                target_val, upper_val = upper_val, target_val
-                warnings.append(f"{p.name}: lower ≥ upper — values were auto-swapped")
-
-        targets[p.id] = target_val
-        uppers[p.id] = upper_val
-
-        # unit (editable)
-        if p.default_unit is not None:
-            unit_val = cols[4].text_input("", value=p.default_unit, key=f"unit_{p.id}")
-        else:
-            unit_val = cols[4].text_input("", key=f"unit_{p.id}")
-
-        units[p.id] = unit_val.strip() if unit_val.strip() else None
+    rows = edited[[_COL_MODE, _COL_TARGET, _COL_UPPER, _COL_UNIT]].itertuples(index=False, name=None)
+    for p, (mode_label, t_raw, u_raw, unit_raw) in zip(PARAMS, rows):
+        mode = _MODE_BY_LABEL[mode_label]
+        collected.append((p, *_collect_row(p, mode, t_raw, u_raw, unit_raw, warnings)))
 
     if warnings:
         st.warning("\n".join(warnings))
 
     st.markdown("### Generate")
 
-    if st.button("Generate Rules JSON", type="primary", disabled=spec_id is None):
+    if spec_id is None:
+        # Nothing to generate against: don't render the button or sync its state.
+        st.caption("Enter a valid spec_id in the sidebar to generate rules.")
+        return
+
+    if st.button("Generate Rules JSON", type="primary"):
         rules: List[Dict[str, Any]] = []
 
-        for p in PARAMS:
-            mode = modes[p.id]
-            unit = units[p.id]
-            t = targets[p.id]
-            u = uppers[p.id]
-
-            # ---------------- Dummy mode ----------------
-            if mode == MODE_DUMMY:
-                rules.append(
-                    rule(
-                        spec_id=spec_id,
-                        param_id=p.id,
-                        ddf_type="perfect",
-                        color="green",
-                        operator="!=",
-                        value='""',  # CRITICAL: LIMS expects literal "" string here
-                        linker=None,
-                        operator2=None,
-                        value2=None,
-                        target=None,
-                        unit=unit,
-                    )
-                )
-                continue
-
-            # ---------------- Lower bound only ----------------
-            if mode == MODE_LOWER_ONLY:
-                if t is None:
-                    # If no threshold provided, skip generating rules for this param
-                    continue
-
-                if p.kind == "moisture":
-                    # reversed logic
-                    rules.append(
-                        rule(
-                            spec_id=spec_id,
-                            param_id=p.id,
-                            ddf_type="perfect",
-                            color="green",
-                            operator="<=",
-                            value=float(q4(t)),
-                            linker=None,
-                            operator2=None,
-                            value2=None,
-                            target=t,
-                            unit=unit,
-                        )
-                    )
-                    rules.append(
-                        rule(
-                            spec_id=spec_id,
-                            param_id=p.id,
-                            ddf_type="not OK",
-                            color="red",
-                            operator=">=",
-                            value=float(q4(t)),
-                            linker=None,
-                            operator2=None,
-                            value2=None,
-                            target=t,
-                            unit=unit,
-                        )
-                    )
-                else:
-                    rules.append(
-                        rule(
-                            spec_id=spec_id,
-                            param_id=p.id,
-                            ddf_type="perfect",
-                            color="green",
-                            operator=">=",
-                            value=float(q4(t)),
-                            linker=None,
-                            operator2=None,
-                            value2=None,
-                            target=t,
-                            unit=unit,
-                        )
-                    )
-                    rules.append(
-                        rule(
-                            spec_id=spec_id,
-                            param_id=p.id,
-                            ddf_type="not OK",
-                            color="red",
-                            operator="<=",
-                            value=float(q4(t)),
-                            linker=None,
-                            operator2=None,
-                            value2=None,
-                            target=t,
-                            unit=unit,
-                        )
-                    )
-                continue
-
-            # ---------------- Lower / upper bound (density only) ----------------
-            if mode == MODE_LOWER_UPPER:
-                if p.id not in DENSITY_IDS:
-                    # Shouldn't happen due to UI options, but keep safe
-                    continue
-                if t is None or u is None:
-                    continue
-
-                rules.append(
-                    rule(
-                        spec_id=spec_id,
-                        param_id=p.id,
-                        ddf_type="perfect",
-                        color="green",
-                        operator=">=",
-                        value=float(q4(t)),
-                        linker="AND",
-                        operator2="<=",
-                        value2=float(q4(u)),
-                        target=t,
-                        unit=unit,
-                    )
-                )
-                rules.append(
-                    rule(
-                        spec_id=spec_id,
-                        param_id=p.id,
-                        ddf_type="not OK",
-                        color="red",
-                        operator="<=",
-                        value=float(q4(t)),
-                        linker="OR",
-                        operator2=">=",
-                        value2=float(q4(u)),
-                        target=t,
-                        unit=unit,
-                    )
-                )
-                continue
-
-            raise RuntimeError(f"Unknown mode: {mode}")
+        for p, mode, tq, uq, unit in collected:
+            rules.extend(EMITTERS[mode](p, tq, uq, unit, spec_id))
 
         payload: Dict[str, Any] = {"rules": rules}
 
         if show_preview:
             st.markdown("### Preview")
-            st.dataframe(
-                [
-                    {
-                        "param_id": r["data"]["parametertype_id"],
-                        "type": r["data"]["DDF_type"],
-                        "operator": r["data"]["operator"],
-                        "value": r["data"]["value"],
-                        "linker": r["data"]["linker"],
-                        "operator2": r["data"]["operator2"],
-                        "value2": r["data"]["value2"],
-                        "unit": r["data"]["DDF_unit"],
-                    }
-                    for r in rules
-                ],
-                use_container_width=True,
-                height=420,
+            preview_df = pd.DataFrame.from_records(
+                (r["data"] for r in rules),
+                columns=list(_PREVIEW_COLUMNS.values()),
             )
+            preview_df.columns = list(_PREVIEW_COLUMNS)
+            st.dataframe(preview_df, use_container_width=True, height=420)
 
         fname = f"{fname_prefix}_{spec_id}_{datetime.now().strftime('%Y%m%d_%H%M')}.json"
         st.download_button(
             "Download Rules JSON",
-            data=json.dumps(payload, indent=2).encode("utf-8"),
+            data=payload_json_bytes(payload),
             file_name=fname,
             mime="application/json",
         )
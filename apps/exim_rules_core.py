@@ -0,0 +1,221 @@
+"""
+exim_rules_core.py — parameters and rule building for the Exim Int Lab Rules Generator (app3.py)
+
+Kept out of the Streamlit script so PARAMS, the rule templates and the emitter table are built once
+per process: Streamlit re-executes the main script on every rerun, but imported modules stay cached.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json produces the same document, just slower
+    orjson = None
+
+
+# ----------------------------- Constants -----------------------------
+
+MODE_LOWER_ONLY: str = "lower"
+MODE_DUMMY: str = "dummy"
+MODE_LOWER_UPPER: str = "lower_upper"
+
+MODE_LABELS: Dict[str, str] = {
+    MODE_LOWER_ONLY: "Lower bound only",
+    MODE_DUMMY: "Dummy mode",
+    MODE_LOWER_UPPER: "Lower / upper bound",
+}
+
+
+def q4f(x: float) -> float:
+    """Round to 4dp, half-up (floor(x * 10^4 + 0.5) / 10^4)."""
+    return math.floor(x * 10000 + 0.5) / 10000
+
+
+# ----------------------------- Parameters -----------------------------
+
+DENSITY_IDS = {11194, 11974}
+
+
+@dataclass(frozen=True, slots=True)
+class Param:
+    id: int
+    name: str
+    kind: str  # density | moisture | mesh
+    default_unit: Optional[str]
+    is_density: bool = field(init=False)  # id in DENSITY_IDS; the only params allowed lower/upper mode
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "is_density", self.id in DENSITY_IDS)
+
+
+PARAMS: List[Param] = [
+    Param(11194, "Bulk Density", "density", "g/cm3"),
+    Param(11196, "Moisture content analysis", "moisture", "%"),
+    Param(11974, "Tapped Density", "density", "g/cm3"),
+    Param(11975, "Mesh Size", "mesh", "%"),
+    Param(12029, "Mesh Size 20", "mesh", "%"),
+    Param(12030, "Mesh Size 40", "mesh", "%"),
+    Param(12031, "Mesh Size 60", "mesh", "%"),
+    Param(12032, "Mesh Size 80", "mesh", "%"),
+    Param(12033, "Mesh Size 100", "mesh", "%"),
+]
+
+
+# ----------------------------- Payload helpers -----------------------------
+
+# (ddf_type, color, operator, linker, operator2): the constant part of one rule.
+RuleShape = Tuple[str, str, str, Optional[str], Optional[str]]
+
+
+def rule(
+    shape: RuleShape,
+    spec_id: int,
+    param_id: int,
+    value: Any,
+    value2: Optional[Any],
+    target_q: Optional[float],
+    unit: Optional[str],
+) -> Dict[str, Any]:
+    """`target_q` and the numeric values are expected already rounded with q4f()."""
+    ddf_type, color, operator, linker, operator2 = shape
+    return {
+        "action": "create",
+        "data": {
+            "color": color,
+            "column": 0,
+            "DDF_target_value": target_q,
+            "DDF_type": ddf_type,
+            "DDF_unit": unit if unit else None,
+            "inverse": 0,
+            "linker": linker,
+            "operator": operator,
+            "operator2": operator2,
+            "parametertype_id": param_id,
+            "regex_filter": None,
+            "show": 1,
+            "spec_id": spec_id,
+            "text": None,
+            "translations": None,
+            "value": value,
+            "value2": value2,
+        },
+    }
+
+
+# ----------------------------- Rule templates -----------------------------
+# Per (param_id, mode): the constant part of every rule that row can emit, built once at import.
+
+_MODE_SHAPES: Dict[str, Tuple[RuleShape, ...]] = {
+    MODE_DUMMY: (("perfect", "green", "!=", None, None),),
+    MODE_LOWER_ONLY: (("perfect", "green", ">=", None, None), ("not OK", "red", "<=", None, None)),
+    MODE_LOWER_UPPER: (("perfect", "green", ">=", "AND", "<="), ("not OK", "red", "<=", "OR", ">=")),
+}
+
+# moisture uses reversed logic for lower bound only
+_MOISTURE_LOWER_SHAPES: Tuple[RuleShape, ...] = (("perfect", "green", "<=", None, None), ("not OK", "red", ">=", None, None))
+
+
+def _templates_for(p: Param, mode: str) -> Tuple[Dict[str, Any], ...]:
+    shapes = _MOISTURE_LOWER_SHAPES if (mode == MODE_LOWER_ONLY and p.kind == "moisture") else _MODE_SHAPES[mode]
+    return tuple(
+        # CRITICAL: LIMS expects the literal "" string as value for dummy rules
+        rule(shape, 0, p.id, '""' if mode == MODE_DUMMY else None, None, None, None)["data"]
+        for shape in shapes
+    )
+
+
+_TEMPLATES: Dict[Tuple[int, str], Tuple[Dict[str, Any], ...]] = {
+    (p.id, mode): _templates_for(p, mode)
+    for p in PARAMS
+    for mode in _MODE_SHAPES
+    if mode != MODE_LOWER_UPPER or p.is_density
+}
+
+
+# ----------------------------- Rule emitters -----------------------------
+# One emitter per mode: (param, target_q, upper_q, unit, spec_id) -> rules for that row.
+
+def _emit_dummy(
+    p: Param, tq: Optional[float], uq: Optional[float], unit: Optional[str], spec_id: int
+) -> List[Dict[str, Any]]:
+    return [
+        {"action": "create", "data": {**t, "DDF_unit": unit or None, "spec_id": spec_id}}
+        for t in _TEMPLATES[p.id, MODE_DUMMY]
+    ]
+
+
+def _emit_lower(
+    p: Param, tq: Optional[float], uq: Optional[float], unit: Optional[str], spec_id: int
+) -> List[Dict[str, Any]]:
+    if tq is None:
+        # If no threshold provided, skip generating rules for this param
+        return []
+
+    return [
+        {
+            "action": "create",
+            "data": {**t, "DDF_target_value": tq, "DDF_unit": unit or None, "spec_id": spec_id, "value": tq},
+        }
+        for t in _TEMPLATES[p.id, MODE_LOWER_ONLY]
+    ]
+
+
+def _emit_lower_upper(
+    p: Param, tq: Optional[float], uq: Optional[float], unit: Optional[str], spec_id: int
+) -> List[Dict[str, Any]]:
+    if not p.is_density:
+        # Shouldn't happen due to UI options, but keep safe
+        return []
+    if tq is None or uq is None:
+        return []
+
+    return [
+        {
+            "action": "create",
+            "data": {
+                **t,
+                "DDF_target_value": tq,
+                "DDF_unit": unit or None,
+                "spec_id": spec_id,
+                "value": tq,
+                "value2": uq,
+            },
+        }
+        for t in _TEMPLATES[p.id, MODE_LOWER_UPPER]
+    ]
+
+
+EMITTERS: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    MODE_DUMMY: _emit_dummy,
+    MODE_LOWER_ONLY: _emit_lower,
+    MODE_LOWER_UPPER: _emit_lower_upper,
+}
+
+
+def payload_json_bytes(payload: Dict[str, Any]) -> bytes:
+    """Pretty-printed (indent=2) UTF-8 JSON bytes for the download button, encoded straight to bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits, which stdlib json still handles
+    # raw UTF-8 (e.g. "µ"), as orjson writes it, rather than \u escapes
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+# ----------------------------- Numeric parsing -----------------------------
+
+def parse_float(s: str) -> Optional[float]:
+    s = (s or "").strip()
+    if s == "" or s.lower() == "null":
+        return None
+    try:
+        v = float(s)
+    except ValueError:
+        return None
+    return v if math.isfinite(v) else None
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import argparse
-from typing import List
 
 import pandas as pd
 
@@ -20,47 +19,35 @@ def add_perfect_and_not_ok_rules(
 
     df: pd.DataFrame = pd.read_csv(input_path)
 
-    new_rows: List[dict] = []
-
-    for _, row in df.iterrows():
-        row_dict: dict = row.to_dict()
-
-        raw_ddf_type = row_dict.get("DDF_type")
-        # Normalize: handle None/NaN, strip spaces, lowercase
-        ddf_type_norm: str = (
-            str(raw_ddf_type).strip().lower() if raw_ddf_type is not None else ""
-        )
-
-        operator = row_dict.get("operator")
-
-        # Only touch rows that are 'perfect' (normalized) and have no operator yet
-        if ddf_type_norm == "perfect" and (
-            pd.isna(operator) or operator == ""  # type: ignore[arg-type]
-        ):
-            # Update this perfect row
-            row_dict["DDF_type"] = raw_ddf_type.strip() if isinstance(raw_ddf_type, str) else "perfect"
-            row_dict["operator"] = "<="
-            row_dict["value"] = threshold
-
-            if not row_dict.get("color"):
-                row_dict["color"] = "green"
-
-            new_rows.append(row_dict)
-
-            # Create matching not OK row underneath
-            not_ok_row: dict = row_dict.copy()
-            not_ok_row["DDF_type"] = "not OK"
-            not_ok_row["color"] = "red"
-            not_ok_row["operator"] = ">"
-            not_ok_row["value"] = threshold
-
-            new_rows.append(not_ok_row)
+    # Normalize: strip spaces, lowercase (blank/NaN cells never match)
+    # (a missing DDF_type/operator column reads as all blank)
+    missing: pd.Series = pd.Series(pd.NA, index=df.index, dtype=object)
+    ddf_type_norm: pd.Series = df.get("DDF_type", missing).astype(str).str.strip().str.lower()
+    operator: pd.Series = df.get("operator", missing)
+
+    # Only touch rows that are 'perfect' (normalized) and have no operator yet;
+    # all other rows (including GC/LC summary lines) are left unchanged
+    mask: pd.Series = (ddf_type_norm == "perfect") & (operator.isna() | (operator == ""))
+    if not mask.any():
+        # nothing to add: rewrite as read (concat with no rows would still upcast int columns)
+        df.to_csv(output_path, index=False)
+        return
+
+    # Update the perfect rows; color defaults to green only when missing or falsy
+    perfect: pd.DataFrame = df.loc[mask]
+    color = perfect["color"].where(perfect["color"].astype(bool), "green") if "color" in df.columns else "green"
+    perfect = perfect.assign(
+        DDF_type=perfect["DDF_type"].astype(str).str.strip(),
+        operator="<=",
+        value=threshold,
+        color=color,
+    )
 
-        else:
-            # Leave all other rows (including GC/LC summary lines) unchanged
-            new_rows.append(row_dict)
+    # Matching not OK rows, indexed to sort directly underneath their perfect row
+    not_ok: pd.DataFrame = perfect.assign(DDF_type="not OK", color="red", operator=">")
+    not_ok.index = not_ok.index + 0.5
 
-    out_df: pd.DataFrame = pd.DataFrame(new_rows)
+    out_df: pd.DataFrame = pd.concat([df.loc[~mask], perfect, not_ok]).sort_index(kind="stable")
     out_df.to_csv(output_path, index=False)
 
 
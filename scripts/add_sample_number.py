@@ -1,8 +1,74 @@
 #!/usr/bin/env python3
 import argparse
+import os
+import shutil
+
 import fitz  # PyMuPDF
 
 
+class SampleNumberStamper:
+    """
+    Add "<label>: <sample_nr>" to the top of the FIRST page of PDFs, in one fixed style.
+    Build it once and call stamp() per file when stamping a batch.
+    """
+
+    def __init__(self, font_name: str = "helv", font_size: float = 14.0, top: float = 20.0) -> None:
+        self.font_name = font_name
+        self.font_size = font_size
+        self.top = top  # distance from the top
+
+    def stamp(self, input_pdf: str, output_pdf: str, label: str, sample_nr: str) -> None:
+        """
+        The output starts as a byte copy of the input and the stamp is appended as an
+        incremental update, so the existing objects are never rewritten. Writing back to
+        the input path (output_pdf == input_pdf) stamps the file in place.
+
+        The copy is stamped beside output_pdf and moved into place only once that
+        succeeded: if stamping fails, output_pdf is left as it was.
+        """
+        tmp_pdf = f"{output_pdf}.tmp"
+        try:
+            shutil.copy(input_pdf, tmp_pdf)  # copy() keeps the mode, for in-place stamping
+            self._stamp_file(tmp_pdf, f"{label}: {sample_nr}")
+            os.replace(tmp_pdf, output_pdf)
+        except BaseException:
+            if os.path.exists(tmp_pdf):
+                os.remove(tmp_pdf)
+            raise
+
+    def _stamp_file(self, pdf_path: str, text: str) -> None:
+        """Draw text centred at the top of the first page of pdf_path, saving in place."""
+        # Measure width for centering (base-14 metrics, as insert_text renders it)
+        text_width = fitz.get_text_length(
+            text,
+            fontname=self.font_name,
+            fontsize=self.font_size
+        )
+
+        with fitz.open(pdf_path) as doc:
+            page = doc[0]
+            x = (page.rect.width - text_width) / 2.0
+
+            # Draw on page
+            page.insert_text(
+                (x, self.top),
+                text,
+                fontsize=self.font_size,
+                fontname=self.font_name,
+                fill=(0, 0, 0),
+            )
+
+            if doc.can_save_incrementally():
+                doc.saveIncr()
+                return
+
+            # Repaired on open: needs a full rewrite, which can't target the file it was opened from
+            data = doc.tobytes()
+
+        with open(pdf_path, "wb") as f:
+            f.write(data)
+
+
 def add_sample_number(
     input_pdf: str,
     output_pdf: str,
@@ -12,38 +78,7 @@ def add_sample_number(
     """
     Add "<label>: <sample_nr>" to the top of the FIRST page of a PDF.
     """
-    doc = fitz.open(input_pdf)
-    page = doc[0]
-    rect = page.rect
-
-    # Compose final text
-    text = f"{label}: {sample_nr}"
-
-    # Style
-    font_size = 14.0
-    font_name = "helv"
-
-    # Measure width for centering
-    text_width = fitz.get_text_length(
-        text,
-        fontname=font_name,
-        fontsize=font_size
-    )
-
-    x = (rect.width - text_width) / 2.0
-    y = 20.0  # distance from the top
-
-    # Draw on page
-    page.insert_text(
-        (x, y),
-        text,
-        fontsize=font_size,
-        fontname=font_name,
-        fill=(0, 0, 0),
-    )
-
-    doc.save(output_pdf)
-    doc.close()
+    SampleNumberStamper().stamp(input_pdf, output_pdf, label, sample_nr)
 
 
 def parse_args() -> argparse.Namespace:
@@ -1,38 +1,34 @@
 import argparse
-import csv
-import json
 import sys
 
+from csv_json_core import read_csv_rows, write_json
+
 def convert_packages_csv(csv_path, output_path):
     data_list = []
     
     try:
-        # Open with utf-8-sig to handle potential BOM
-        with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
+        # Read as utf-8-sig to handle potential BOM
+        for row in read_csv_rows(csv_path):
+            # Construct the data object
+            # Using .strip() to clean up whitespace
+            package_data = {
+                "template_id": row.get('template_id', '').strip(),
+                "field": row.get('field', '').strip()
+            }
+            
+            # Wrap in the action object
+            action_obj = {
+                "action": "create",
+                "data": package_data
+            }
             
-            for row in reader:
-                # Construct the data object
-                # Using .strip() to clean up whitespace
-                package_data = {
-                    "template_id": row.get('template_id', '').strip(),
-                    "field": row.get('field', '').strip()
-                }
-                
-                # Wrap in the action object
-                action_obj = {
-                    "action": "create",
-                    "data": package_data
-                }
-                
-                data_list.append(action_obj)
+            data_list.append(action_obj)
         
         # Create final structure with root key "templatefields"
         final_json = {"templatefields": data_list}
         
         # Write to output file
-        with open(output_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(final_json, jsonfile, indent=4, ensure_ascii=False)
+        write_json(final_json, output_path, ensure_ascii=False)
             
         print(f"Successfully converted '{csv_path}' to '{output_path}'.")
         print(f"Total package links created: {len(data_list)}")
@@ -1,59 +1,55 @@
 import argparse
-import csv
-import json
 import sys
 
+from csv_json_core import read_csv_rows, write_json
+
 def convert_csv_to_json(csv_path, output_path):
     data_list = []
     
     try:
-        # Open with utf-8-sig to handle potential BOM from Excel CSVs
-        with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
+        # Read as utf-8-sig to handle potential BOM from Excel CSVs
+        for row in read_csv_rows(csv_path):
+            # Filter out existing parameters
+            existing_val = row.get('existing', '').strip().lower()
+            if existing_val == 'yes':
+                continue
             
-            for row in reader:
-                # Filter out existing parameters
-                existing_val = row.get('existing', '').strip().lower()
-                if existing_val == 'yes':
-                    continue
-                
-                # Helper function to clean values (handle None/Empty -> "")
-                def clean(val):
-                    if val is None:
-                        return ""
-                    return val.strip()
+            # Helper function to clean values (handle None/Empty -> "")
+            def clean(val):
+                if val is None:
+                    return ""
+                return val.strip()
 
-                # Construct the nested data object
-                param_data = {
-                    "name": clean(row.get('name')),
-                    "group_id": clean(row.get('group_id')),
-                    "DDF_days": clean(row.get('DDF_days')),
-                    "DDF_price": clean(row.get('DDF_price')),
-                    "description": clean(row.get('description')),
-                    "einheit": clean(row.get('einheit')),
-                    "DDF_GBAID": clean(row.get('DDF_GBAID')),
-                    "translations": {
-                        "en": {
-                            "name": clean(row.get('translations_en_name')),
-                            "einheit": clean(row.get('translations_en_einheit'))
-                        }
+            # Construct the nested data object
+            param_data = {
+                "name": clean(row.get('name')),
+                "group_id": clean(row.get('group_id')),
+                "DDF_days": clean(row.get('DDF_days')),
+                "DDF_price": clean(row.get('DDF_price')),
+                "description": clean(row.get('description')),
+                "einheit": clean(row.get('einheit')),
+                "DDF_GBAID": clean(row.get('DDF_GBAID')),
+                "translations": {
+                    "en": {
+                        "name": clean(row.get('translations_en_name')),
+                        "einheit": clean(row.get('translations_en_einheit'))
                     }
                 }
-                
-                # Wrap in the action object
-                action_obj = {
-                    "action": "create",
-                    "data": param_data
-                }
-                
-                data_list.append(action_obj)
+            }
+            
+            # Wrap in the action object
+            action_obj = {
+                "action": "create",
+                "data": param_data
+            }
+            
+            data_list.append(action_obj)
         
         # Create final structure
         final_json = {"parametertypes": data_list}
         
         # Write to output file
-        with open(output_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(final_json, jsonfile, indent=4, ensure_ascii=False)
+        write_json(final_json, output_path, ensure_ascii=False)
             
         print(f"Successfully converted '{csv_path}' to '{output_path}'.")
         print(f"Total parameters created: {len(data_list)}")
@@ -1,9 +1,9 @@
-import csv
-import json
 import argparse
 import os
 import sys
 
+from csv_json_core import read_csv_rows, write_json
+
 def parse_int_or_null(value):
     """Parses string to int, returns None if empty."""
     if value and value.strip():
@@ -13,6 +13,9 @@ def parse_int_or_null(value):
             return None
     return None
 
+# int()/float() only accept text starting with a sign, a digit, '.', nan/inf or a non-ASCII digit
+_NUMBER_START = frozenset("+-.0123456789nNiI")
+
 def smart_parse(value):
     """
     Parses value to int or float if possible, otherwise returns string.
@@ -24,20 +27,27 @@ def smart_parse(value):
     
     val = value.strip()
     
-    # 1. Try Integer (Cleanest for whole numbers like 30)
-    try:
+    # Text that can't be a number (like "negative") skips the int/float attempts entirely
+    c0 = val[0]
+    if c0 not in _NUMBER_START and c0.isascii():
+        return val
+    
+    # 1. Integer (Cleanest for whole numbers like 30); int() also takes "1_000"
+    digits = val[1:] if c0 in "+-" else val
+    if digits.isdecimal():
         return int(val)
-    except ValueError:
-        pass
+    if "_" in val:
+        try:
+            return int(val)
+        except ValueError:
+            pass
     
     # 2. Try Float (For decimals like 30.5)
     try:
         return float(val)
     except ValueError:
-        pass
-    
-    # 3. Return as String (For text like "negative")
-    return val
+        # 3. Return as String
+        return val
 
 def parse_string_or_null(value):
     """Returns string value or None if empty."""
@@ -53,48 +63,44 @@ def convert_rules(csv_path, json_path, delimiter):
         sys.exit(1)
 
     try:
-        with open(csv_path, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
+        for row in read_csv_rows(csv_path, delimiter):
+            data = {}
+            
+            # 1. Integer Fields
+            data['spec_id'] = parse_int_or_null(row.get('spec_id'))
+            data['show'] = parse_int_or_null(row.get('show'))
+            data['column'] = parse_int_or_null(row.get('column'))
+            data['inverse'] = parse_int_or_null(row.get('inverse'))
+            data['parametertype_id'] = parse_int_or_null(row.get('parametertype_id'))
+            
+            # 2. Polymorphic Fields (Number or String)
+            # Both value and value2 can be Int, Float, String, or Null
+            data['value'] = smart_parse(row.get('value'))
+            data['value2'] = smart_parse(row.get('value2'))
             
-            for row in reader:
-                data = {}
-                
-                # 1. Integer Fields
-                data['spec_id'] = parse_int_or_null(row.get('spec_id'))
-                data['show'] = parse_int_or_null(row.get('show'))
-                data['column'] = parse_int_or_null(row.get('column'))
-                data['inverse'] = parse_int_or_null(row.get('inverse'))
-                data['parametertype_id'] = parse_int_or_null(row.get('parametertype_id'))
-                
-                # 2. Polymorphic Fields (Number or String)
-                # Both value and value2 can be Int, Float, String, or Null
-                data['value'] = smart_parse(row.get('value'))
-                data['value2'] = smart_parse(row.get('value2'))
-                
-                # 3. String Fields
-                data['DDF_unit'] = parse_string_or_null(row.get('DDF_unit'))
-                data['DDF_target_value'] = parse_string_or_null(row.get('DDF_target_value'))
-                data['DDF_type'] = parse_string_or_null(row.get('DDF_type'))
-                data['color'] = parse_string_or_null(row.get('color'))
-                data['operator'] = parse_string_or_null(row.get('operator'))
-                data['linker'] = parse_string_or_null(row.get('linker'))
-                data['operator2'] = parse_string_or_null(row.get('operator2'))
-                data['regex_filter'] = parse_string_or_null(row.get('regex_filter'))
-                data['text'] = parse_string_or_null(row.get('text'))
-                data['translations'] = parse_string_or_null(row.get('translations'))
+            # 3. String Fields
+            data['DDF_unit'] = parse_string_or_null(row.get('DDF_unit'))
+            data['DDF_target_value'] = parse_string_or_null(row.get('DDF_target_value'))
+            data['DDF_type'] = parse_string_or_null(row.get('DDF_type'))
+            data['color'] = parse_string_or_null(row.get('color'))
+            data['operator'] = parse_string_or_null(row.get('operator'))
+            data['linker'] = parse_string_or_null(row.get('linker'))
+            data['operator2'] = parse_string_or_null(row.get('operator2'))
+            data['regex_filter'] = parse_string_or_null(row.get('regex_filter'))
+            data['text'] = parse_string_or_null(row.get('text'))
+            data['translations'] = parse_string_or_null(row.get('translations'))
 
-                # Construct the wrapper
-                rule_entry = {
-                    "action": "create",
-                    "data": data
-                }
-                rules_list.append(rule_entry)
+            # Construct the wrapper
+            rule_entry = {
+                "action": "create",
+                "data": data
+            }
+            rules_list.append(rule_entry)
 
         # Final wrapper
         final_json = {"rules": rules_list}
 
-        with open(json_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(final_json, jsonfile, indent=4)
+        write_json(final_json, json_path)
             
         print(f"Successfully converted '{csv_path}' to '{json_path}' using delimiter '{delimiter}'")
 
@@ -1,9 +1,9 @@
-import csv
-import json
 import argparse
 import os
 import sys
 
+from csv_json_core import read_csv_rows, write_json
+
 def parse_int_or_null(value):
     """Helper to convert string values to int or None if empty."""
     if value and value.strip():
@@ -21,35 +21,31 @@ def convert_specs(csv_file_path, json_file_path, delimiter):
         sys.exit(1)
 
     try:
-        with open(csv_file_path, mode='r', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=delimiter)
-
-            for row in reader:
-                data = {}
-                
-                # 1. Map simple fields
-                data['name'] = row.get('name')
+        for row in read_csv_rows(csv_file_path, delimiter):
+            data = {}
+            
+            # 1. Map simple fields
+            data['name'] = row.get('name')
 
-                # 2. Convert numeric fields
-                data['type'] = parse_int_or_null(row.get('type'))
-                data['status'] = parse_int_or_null(row.get('status'))
-                data['archiviert'] = parse_int_or_null(row.get('archiviert'))
-                data['order'] = parse_int_or_null(row.get('order'))
+            # 2. Convert numeric fields
+            data['type'] = parse_int_or_null(row.get('type'))
+            data['status'] = parse_int_or_null(row.get('status'))
+            data['archiviert'] = parse_int_or_null(row.get('archiviert'))
+            data['order'] = parse_int_or_null(row.get('order'))
 
-                # 3. Hardcode translations to null (Legacy Requirement)
-                data['translations'] = None
+            # 3. Hardcode translations to null (Legacy Requirement)
+            data['translations'] = None
 
-                # 4. Construct the spec object
-                spec_entry = {
-                    "action": "create",
-                    "data": data
-                }
-                specs.append(spec_entry)
+            # 4. Construct the spec object
+            spec_entry = {
+                "action": "create",
+                "data": data
+            }
+            specs.append(spec_entry)
 
         final_output = {"specs": specs}
 
-        with open(json_file_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(final_output, jsonfile, indent=4)
+        write_json(final_output, json_file_path)
             
         print(f"Successfully converted '{csv_file_path}' to '{json_file_path}' using delimiter '{delimiter}'")
 
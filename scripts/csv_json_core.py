@@ -0,0 +1,27 @@
+"""
+csv_json_core.py — CSV reading and JSON writing shared by the convert_*_csv_to_json.py scripts
+
+The scripts keep their own per-row mapping; this module owns the I/O either side of it.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import Any, Dict, List, Optional
+
+def read_csv_rows(csv_path: str, delimiter: str = ",") -> List[Dict[str, Optional[str]]]:
+    """All rows of a UTF-8 CSV (Excel's BOM is stripped) as header -> cell dicts."""
+    with open(csv_path, mode="r", encoding="utf-8-sig") as csvfile:
+        return list(csv.DictReader(csvfile, delimiter=delimiter))
+
+
+def write_json(payload: Dict[str, Any], json_path: str, ensure_ascii: bool = True) -> None:
+    """
+    Write payload as 4-space indented UTF-8 JSON: the same bytes as json.dump(payload, f, indent=4,
+    ensure_ascii=ensure_ascii), encoded in one go and written in a single write instead of chunk by chunk.
+    orjson isn't used here: it can't indent by 4 or escape non-ASCII, so its output would differ.
+    """
+    text = json.dumps(payload, indent=4, ensure_ascii=ensure_ascii)
+    with open(json_path, "wb") as jsonfile:
+        jsonfile.write(text.encode("utf-8"))
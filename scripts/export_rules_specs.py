@@ -3,15 +3,50 @@ from __future__ import annotations
 
 import argparse
 import csv
+import glob
+import hashlib
 import json
+import operator
 import sys
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json produces the same document, just slower
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: csv.reader reads the same rows, just slower
+    pa = None
+    pacsv = None
+
+from rules_json_core import has_non_finite
 
 Number = Union[int, float]
 
+# Below this file size csv.reader wins: pyarrow's per-file setup outweighs its faster parse
+_ARROW_MIN_BYTES = 256 * 1024
+
+# The Specs 'translations' string exactly as json.dumps({"en": {"name": <name>, ...}}) writes it,
+# minus the encoded name that goes between prefix and suffix.
+_SPECS_TRANSLATIONS_PREFIX = '{"en": {"name": '
+_SPECS_TRANSLATIONS_SUFFIX = (
+    ', "DDF_Defaulttext_OK": "NULL", "DDF_Defaulttext_NOT_OK": "NULL", '
+    '"DDF_Defaulttext_Toleranzbereich_NOT_OK": "NULL"}}'
+)
+
+# Raw header -> normalized header; the Specs/Rules files share one schema, so the same few
+# headers come back for every file
+_HEADER_CACHE: Dict[str, str] = {}
+
+# float() only accepts (stripped) text starting with a sign, a digit, '.', nan/inf or a non-ASCII digit
+_NUMBER_START = frozenset("+-.0123456789nNiI")
+
 
 @dataclass
 class ExportResult:
@@ -44,6 +79,7 @@ class SpecsRulesExporter:
         rules_csvs: Optional[Iterable[Union[str, Path]]] = None,
         out_specs: Optional[Union[str, Path]] = None,
         out_rules: Optional[Union[str, Path]] = None,
+        omit_nulls: bool = False,
     ) -> None:
         """
         Parameters
@@ -56,12 +92,16 @@ class SpecsRulesExporter:
             Target Specs JSON file path (before auto _1, _2 suffixing).
         out_rules : str | Path | None
             Target Rules JSON file path (before auto _1, _2 suffixing).
+        omit_nulls : bool
+            Leave null fields out of each Rule's "data" instead of writing them as null.
+            Only for consumers that treat a missing field as null.
         """
         self.specs_csvs: List[Path] = [Path(p) for p in specs_csvs] if specs_csvs is not None else []
         self.rules_csvs: List[Path] = [Path(p) for p in rules_csvs] if rules_csvs is not None else []
 
         self.out_specs: Optional[Path] = Path(out_specs) if out_specs is not None else None
         self.out_rules: Optional[Path] = Path(out_rules) if out_rules is not None else None
+        self.omit_nulls: bool = omit_nulls
 
     # --------------------------- Public API ---------------------------
 
@@ -86,88 +126,102 @@ class SpecsRulesExporter:
             if self.out_specs is None:
                 raise ValueError("out_specs must be provided when specs_csvs are given.")
             specs_rows: List[Dict[str, Any]] = self._read_and_merge_csvs(self.specs_csvs, kind="Specs")
-            specs_payload: Dict[str, Any] = self._build_specs_payload(specs_rows)
             final_specs_path: Path = self._get_unique_out_path(self.out_specs)
-            specs_path = self._save_json(specs_payload, final_specs_path)
+            specs_path = self._save_json("specs", self._iter_specs_items(specs_rows), final_specs_path)
 
         # Rules branch
         if self.rules_csvs:
             if self.out_rules is None:
                 raise ValueError("out_rules must be provided when rules_csvs are given.")
             rules_rows: List[Dict[str, Any]] = self._read_and_merge_csvs(self.rules_csvs, kind="Rules")
-            rules_payload: Dict[str, Any] = self._build_rules_payload(rules_rows)
             final_rules_path: Path = self._get_unique_out_path(self.out_rules)
-            rules_path = self._save_json(rules_payload, final_rules_path)
+            rules_path = self._save_json("rules", self._iter_rules_items(rules_rows), final_rules_path)
 
         return ExportResult(specs_json=specs_path, rules_json=rules_path)
 
     # ------------------------- Building payloads -------------------------
 
-    def _build_specs_payload(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _iter_specs_items(self, rows: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
-        Match Apps Script behavior for Specs:
+        Yield the "specs" items one by one, matching Apps Script behavior for Specs:
         - type/status/archiviert -> int (or null)
         - order -> None if blank or literal 'null', else keep string
         - translations -> JSON STRING of {"en": {...}} (same as Apps Script)
         """
-        items: List[Dict[str, Any]] = []
-        for row in rows:
-            name: str = self._to_str(row.get("name"))
-            item: Dict[str, Any] = {
+        names = self._coerce_column(rows, "name", self._to_str)
+        types = self._coerce_column(rows, "type", self._to_int)
+        statuses = self._coerce_column(rows, "status", self._to_int)
+        archived = self._coerce_column(rows, "archiviert", self._to_int)
+        orders = self._coerce_column(rows, "order", self._null_if_blank_or_literal_null)
+        translations = self._coerce_column(rows, "name", self._specs_translations)
+
+        rows_out = zip(names, types, statuses, archived, orders, translations)
+        for name, type_, status, archiviert, order, translations_json in rows_out:
+            yield {
                 "action": "create",
                 "data": {
                     "name": name,
-                    "type": self._to_int(row.get("type")),
-                    "status": self._to_int(row.get("status")),
-                    "archiviert": self._to_int(row.get("archiviert")),
-                    "order": self._null_if_blank_or_literal_null(row.get("order")),
+                    "type": type_,
+                    "status": status,
+                    "archiviert": archiviert,
+                    "order": order,
                     # Keep translations as JSON STRING
-                    "translations": json.dumps({
-                        "en": {
-                            "name": name,
-                            "DDF_Defaulttext_OK": "NULL",
-                            "DDF_Defaulttext_NOT_OK": "NULL",
-                            "DDF_Defaulttext_Toleranzbereich_NOT_OK": "NULL",
-                        }
-                    }),
+                    "translations": translations_json,
                 },
             }
-            items.append(item)
-
-        return {"specs": items}
 
-    def _build_rules_payload(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _iter_rules_items(self, rows: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
-        Match Apps Script behavior for Rules:
+        Yield the "rules" items one by one, matching Apps Script behavior for Rules:
         - Integers: column, inverse, parametertype_id, show, spec_id
         - DDF_target_value, DDF_unit, linker, operator2, regex_filter, text, translations, value2:
           -> None if blank/'null', else keep string
         - value: numeric if can parse, else keep as string (e.g. 'OK'); blank/'null' -> None
+        - with omit_nulls, None fields are left out of "data"
         """
-        items: List[Dict[str, Any]] = []
-        for row in rows:
-            data: Dict[str, Any] = {
-                "color": self._to_str(row.get("color")),
-                "column": self._to_int(row.get("column")),
-                "DDF_target_value": self._null_if_blank_or_literal_null(row.get("DDF_target_value")),
-                "DDF_type": self._to_str(row.get("DDF_type")),
-                "DDF_unit": self._null_if_blank_or_literal_null(row.get("DDF_unit")),
-                "inverse": self._to_int(row.get("inverse")),
-                "linker": self._null_if_blank_or_literal_null(row.get("linker")),
-                "operator": self._to_str(row.get("operator")),
-                "operator2": self._null_if_blank_or_literal_null(row.get("operator2")),
-                "parametertype_id": self._to_int(row.get("parametertype_id")),
-                "regex_filter": self._null_if_blank_or_literal_null(row.get("regex_filter")),
-                "show": self._to_int(row.get("show")),
-                "spec_id": self._to_int(row.get("spec_id")),
-                "text": self._null_if_blank_or_literal_null(row.get("text")),
-                "translations": self._null_if_blank_or_literal_null(row.get("translations")),
-                "value": self._to_number_or_keep(row.get("value")),
-                "value2": self._null_if_blank_or_literal_null(row.get("value2")),
-            }
-            items.append({"action": "create", "data": data})
+        fields: List[Tuple[str, Callable[[Any], Any]]] = [
+            ("color", self._to_str),
+            ("column", self._to_int),
+            ("DDF_target_value", self._null_if_blank_or_literal_null),
+            ("DDF_type", self._to_str),
+            ("DDF_unit", self._null_if_blank_or_literal_null),
+            ("inverse", self._to_int),
+            ("linker", self._null_if_blank_or_literal_null),
+            ("operator", self._to_str),
+            ("operator2", self._null_if_blank_or_literal_null),
+            ("parametertype_id", self._to_int),
+            ("regex_filter", self._null_if_blank_or_literal_null),
+            ("show", self._to_int),
+            ("spec_id", self._to_int),
+            ("text", self._null_if_blank_or_literal_null),
+            ("translations", self._null_if_blank_or_literal_null),
+            ("value", self._to_number_or_keep),
+            ("value2", self._null_if_blank_or_literal_null),
+        ]
+        keys = [key for key, _ in fields]
+        coerced = [self._coerce_column(rows, key, coerce) for key, coerce in fields]
+
+        for values in zip(*coerced):
+            if self.omit_nulls:
+                yield {"action": "create", "data": {k: v for k, v in zip(keys, values) if v is not None}}
+            else:
+                yield {"action": "create", "data": dict(zip(keys, values))}
 
-        return {"rules": items}
+    def _specs_translations(self, name: Any) -> str:
+        """The Specs 'translations' JSON string for a raw name cell (one json.dumps per distinct name)."""
+        return _SPECS_TRANSLATIONS_PREFIX + json.dumps(self._to_str(name)) + _SPECS_TRANSLATIONS_SUFFIX
+
+    def _coerce_column(
+        self, rows: List[Dict[str, Any]], key: str, coerce: Callable[[Any], Any]
+    ) -> List[Any]:
+        """
+        Coerce the `key` cell of every row a column at a time (missing cells read as None).
+        Columns repeat the same few values (spec_id, show, operator, ...), so `coerce` runs
+        once per distinct cell and every row reuses that result.
+        """
+        raw = [row.get(key) for row in rows]
+        coerced = {v: coerce(v) for v in set(raw)}
+        return [coerced[v] for v in raw]
 
     # ---------------------- CSV reading / merging ----------------------
 
@@ -181,6 +235,7 @@ class SpecsRulesExporter:
           * if sets equal but order differs -> soft warning
         - Strips whitespace from every cell.
         - Deduplicates rows across all files (preserve first occurrence).
+        - Skips a file that is byte-identical to an earlier one: every one of its rows is a duplicate.
         """
         if not paths:
             return []
@@ -188,12 +243,25 @@ class SpecsRulesExporter:
         normalized_header_ref: Optional[List[str]] = None
         original_header_ref: Optional[List[str]] = None
 
-        all_rows: List[Dict[str, Any]] = []
+        # Deduplicate rows while preserving first occurrence. Two rows are duplicates when
+        # their items match; within one file every row has the same keys, so the key is an id
+        # for that key set plus the values in sorted-key order (no per-row sort or items tuple).
+        deduped_rows: List[Dict[str, Any]] = []
+        seen: Set[Tuple[Any, ...]] = set()
+        key_set_ids: Dict[Tuple[str, ...], int] = {}
+        seen_files: Set[bytes] = set()
 
         for idx, path in enumerate(paths):
             if not path.exists():
                 raise FileNotFoundError(f"{kind} CSV not found: {path}")
 
+            if len(paths) > 1:
+                with path.open("rb") as f:
+                    digest: bytes = hashlib.file_digest(f, "sha256").digest()
+                if digest in seen_files:
+                    continue
+                seen_files.add(digest)
+
             rows, headers = self._read_single_csv(path)
             normalized_headers: List[str] = [self._normalize_header(h) for h in headers]
 
@@ -220,19 +288,21 @@ class SpecsRulesExporter:
                         file=sys.stderr,
                     )
 
-            all_rows.extend(rows)
-
-        # Deduplicate rows while preserving first occurrence
-        deduped_rows: List[Dict[str, Any]] = []
-        seen: Set[Tuple[Tuple[str, Any], ...]] = set()
-
-        for row in all_rows:
-            # row is already cleaned (values stripped)
-            key_tuple: Tuple[Tuple[str, Any], ...] = tuple(sorted(row.items()))
-            if key_tuple in seen:
-                continue
-            seen.add(key_tuple)
-            deduped_rows.append(row)
+            keys: Tuple[str, ...] = tuple(sorted(set(headers)))
+            key_set_id: int = key_set_ids.setdefault(keys, len(key_set_ids))
+            values_of = operator.itemgetter(*keys) if keys else None
+
+            for row in rows:
+                # row is already cleaned (values stripped)
+                if values_of is not None and len(row) == len(keys):
+                    key: Tuple[Any, ...] = (key_set_id, values_of(row))
+                else:
+                    # surplus cells sit under a None key (see _read_single_csv): fall back to the items themselves
+                    key = tuple(sorted(row.items()))
+                if key in seen:
+                    continue
+                seen.add(key)
+                deduped_rows.append(row)
 
         return deduped_rows
 
@@ -243,42 +313,81 @@ class SpecsRulesExporter:
         - Skips fully blank lines.
         - Strips whitespace from every cell.
         """
+        if pacsv is not None and path.stat().st_size >= _ARROW_MIN_BYTES:
+            parsed = self._read_single_csv_arrow(path)
+            if parsed is not None:
+                return parsed
+
         rows: List[Dict[str, Any]] = []
         with path.open("r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames is None:
+            # Rows come out as csv.DictReader would build them, without its per-row bookkeeping
+            reader = csv.reader(f)
+            first: Optional[List[str]] = next(reader, None)
+            if first is None:
                 raise ValueError(f"CSV '{path}' has no header row.")
-            headers: List[str] = list(reader.fieldnames)
+            headers: List[str] = first
+            width: int = len(headers)
 
-            for raw in reader:
-                if raw is None:
+            for cells in reader:
+                if not cells:
                     continue
 
-                # Clean each cell: strip whitespace, convert None -> ""
-                cleaned: Dict[str, Any] = {}
-                for key, value in raw.items():
-                    if value is None:
-                        cleaned_value: str = ""
-                    else:
-                        cleaned_value = str(value).strip()
-                    cleaned[key] = cleaned_value
-
-                # Check if row is fully blank after stripping
-                values_joined: str = "".join(cleaned.values())
-                if values_joined.strip() == "":
+                # Clean each cell: strip whitespace; missing trailing cells -> ""
+                cleaned_cells: List[str] = [c.strip() for c in cells[:width]]
+                if len(cleaned_cells) < width:
+                    cleaned_cells += [""] * (width - len(cleaned_cells))
+                cleaned: Dict[Any, str] = dict(zip(headers, cleaned_cells))
+                if len(cells) > width:
+                    # surplus cells go under a None key, as DictReader's restkey
+                    cleaned[None] = str(cells[width:]).strip()
+
+                # Skip the row if it is fully blank after stripping
+                if not any(cleaned.values()):
                     continue
 
                 rows.append(cleaned)
 
         return rows, headers
 
+    def _read_single_csv_arrow(self, path: Path) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        """
+        Same (rows, headers) as the csv.reader path in `_read_single_csv`, parsed by pyarrow's
+        C reader with every column read as a string, then stripped a column at a time.
+
+        Returns None for files pyarrow rejects (e.g. short or long rows) or whose header isn't
+        on the first line, so the caller falls back to csv.reader.
+        """
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            headers = next(csv.reader(f), None)
+        if not headers:
+            return None
+
+        try:
+            # memory-mapped: the parser reads the page cache directly instead of copying through a file buffer
+            with pa.memory_map(str(path)) as source:
+                table = pacsv.read_csv(
+                    source,
+                    parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                    convert_options=pacsv.ConvertOptions(column_types={name: pa.string() for name in headers}),
+                )
+                columns = [[v.strip() for v in col.to_pylist()] for col in table.columns]
+        except pa.ArrowInvalid:
+            return None
+
+        # a row is fully blank when every stripped cell is empty
+        rows = [dict(zip(headers, values)) for values in zip(*columns) if any(values)]
+        return rows, headers
+
     def _normalize_header(self, header: str) -> str:
         """
         Normalize a header for comparison:
         - lowercase
         - strip surrounding whitespace
         """
-        return header.strip().lower()
+        normalized = _HEADER_CACHE.get(header)
+        if normalized is None:
+            normalized = _HEADER_CACHE[header] = header.strip().lower()
+        return normalized
 
     # --------------------------- I/O helpers ---------------------------
 
@@ -297,21 +406,32 @@ class SpecsRulesExporter:
         suffix: str = requested.suffix
         parent: Path = requested.parent
 
+        # One directory listing instead of a stat per taken number
+        taken: Set[str] = {p.name for p in parent.glob(f"{glob.escape(stem)}_*{glob.escape(suffix)}")}
+
         i: int = 1
         while True:
-            candidate: Path = parent / f"{stem}_{i}{suffix}"
-            if not candidate.exists():
-                return candidate
+            name: str = f"{stem}_{i}{suffix}"
+            if name not in taken:
+                candidate: Path = parent / name
+                # still stat the pick: on case-insensitive filesystems a listed name may differ only in case
+                if not candidate.exists():
+                    return candidate
             i += 1
 
-    def _save_json(self, payload: Dict[str, Any], out_path: Path) -> Path:
+    def _save_json(self, root_key: str, items: Iterable[Dict[str, Any]], out_path: Path) -> Path:
         """
-        Save payload as JSON with UTF-8 encoding and pretty indent.
+        Save {root_key: [items...]} as JSON with UTF-8 encoding and pretty indent.
+        Items are encoded and written one at a time as they are produced, so neither the
+        whole payload nor its encoded bytes are held in memory. orjson does the encoding
+        when installed (items holding NaN/Infinity excepted, so those are kept as is).
 
         Parameters
         ----------
-        payload : Dict[str, Any]
-            The data to serialize.
+        root_key : str
+            The top-level key ("specs" or "rules").
+        items : Iterable[Dict[str, Any]]
+            The items of the top-level list.
         out_path : Path
             Where to write the file.
 
@@ -321,24 +441,44 @@ class SpecsRulesExporter:
             The written file path.
         """
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        with out_path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-            f.write("\n")
+        with out_path.open("wb", buffering=1 << 20) as f:
+            f.write(b'{\n  ' + json.dumps(root_key).encode("utf-8") + b": [")
+            # Each item sits two levels deep: shift its own indent-2 lines right by 4
+            sep = b"\n    "
+            for item in items:
+                f.write(sep)
+                f.write(self._encode_item(item).replace(b"\n", b"\n    "))
+                sep = b",\n    "
+            f.write(b"]\n}\n" if sep == b"\n    " else b"\n  ]\n}\n")
         return out_path
 
+    @staticmethod
+    def _encode_item(item: Dict[str, Any]) -> bytes:
+        """One list item as indent-2 JSON bytes, laid out as a whole-payload dump would."""
+        if orjson is not None and not has_non_finite(item):  # orjson would write NaN/Infinity as null
+            try:
+                return orjson.dumps(item, option=orjson.OPT_INDENT_2)
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers wider than 64 bits (_to_int("1e30")), which stdlib json still handles
+        return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+
     # ---------------------- Coercion / conversion ----------------------
 
     def _null_if_blank_or_literal_null(self, value: Any) -> Optional[str]:
         """
-        Convert '', None, 'null' (any case, with optional surrounding spaces) -> None.
+        Convert '', None, 'null' (any case) -> None.
         Otherwise return the original value as string.
 
-        NOTE: whitespace has already been stripped from cell values on read.
+        NOTE: whitespace has already been stripped from cell values on read, so string
+        cells are used as they are; only non-string values are converted and stripped.
         """
         if value is None:
             return None
-        s: str = str(value).strip()
-        if s == "" or s.lower() == "null":
+        s: str = value if isinstance(value, str) else str(value).strip()
+        if not s:
+            return None
+        # only a 4-character cell can spell null; skip lower() for everything else
+        if len(s) == 4 and s.lower() == "null":
             return None
         return s
 
@@ -348,7 +488,7 @@ class SpecsRulesExporter:
         Otherwise return None.
         """
         v: Optional[str] = self._null_if_blank_or_literal_null(value)
-        if v is None:
+        if v is None or (v[0] not in _NUMBER_START and v[0].isascii()):
             return None
         try:
             # allow floats like "3.0" to become 3
@@ -366,6 +506,8 @@ class SpecsRulesExporter:
         v: Optional[str] = self._null_if_blank_or_literal_null(value)
         if v is None:
             return None
+        if v[0] not in _NUMBER_START and v[0].isascii():
+            return v  # plainly not a number (e.g. 'OK'): skip the failed float()
         try:
             # integer?
             if v.isdigit() or (v.startswith("-") and v[1:].isdigit()):
@@ -441,6 +583,16 @@ def main() -> None:
         ),
     )
 
+    parser.add_argument(
+        "--omit-nulls",
+        dest="omit_nulls",
+        action="store_true",
+        help=(
+            "Leave null fields out of each Rule instead of writing them as null "
+            "(smaller file; only for consumers that treat a missing field as null)."
+        ),
+    )
+
     args = parser.parse_args()
 
     specs_paths_raw: Optional[List[str]] = args.specs
@@ -460,6 +612,7 @@ def main() -> None:
         rules_csvs=rules_paths_raw,
         out_specs=args.out_specs,
         out_rules=args.out_rules,
+        omit_nulls=args.omit_nulls,
     )
 
     result: ExportResult = exporter.run()
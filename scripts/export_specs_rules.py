@@ -1,15 +1,50 @@
 from __future__ import annotations
 
 import csv
+import functools
 import json
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json produces the same document, just slower
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: csv.DictReader reads the same rows, just slower
+    pa = None
+    pacsv = None
+
+from rules_json_core import has_non_finite
 
 Number = Union[int, float]
 
+# CSV read column-wise: header -> cells, one per kept row (None where a short row had no cell)
+Columns = Dict[str, List[Optional[str]]]
+
+# float() only accepts (stripped) text starting with a sign, a digit, '.', nan/inf or a non-ASCII digit
+_NUMBER_START = frozenset("+-.0123456789nNiI")
+
+
+def _could_be_number(s: str) -> bool:
+    """Cheap pre-check so text like 'OK' skips the try/float()/except round trip."""
+    return s[0] in _NUMBER_START or not s[0].isascii()
+
+
+# json.dumps({"en": {"name": <name>, "DDF_Defaulttext_OK": "NULL", ...}}) split around the name,
+# so each spec only JSON-encodes its name (default separators and ensure_ascii, as before).
+_SPECS_TRANSLATIONS_PREFIX = '{"en": {"name": '
+_SPECS_TRANSLATIONS_SUFFIX = (
+    ', "DDF_Defaulttext_OK": "NULL"'
+    ', "DDF_Defaulttext_NOT_OK": "NULL"'
+    ', "DDF_Defaulttext_Toleranzbereich_NOT_OK": "NULL"}}'
+)
+
 
 @dataclass
 class ExportResult:
@@ -34,6 +69,7 @@ class SpecsRulesExporter:
         specs_csv: Optional[Union[str, Path]] = None,
         rules_csv: Optional[Union[str, Path]] = None,
         out_dir: Union[str, Path] = ".",
+        pretty: bool = True,
     ) -> None:
         """
         Parameters
@@ -44,10 +80,40 @@ class SpecsRulesExporter:
             Path to Rules CSV (optional).
         out_dir : str | Path
             Directory to write output JSON files.
+        pretty : bool
+            Indent the JSON (2 spaces). False writes compact JSON, which is much
+            faster to produce when orjson isn't installed.
         """
         self.specs_csv: Optional[Path] = Path(specs_csv) if specs_csv is not None else None
         self.rules_csv: Optional[Path] = Path(rules_csv) if rules_csv is not None else None
         self.out_dir: Path = Path(out_dir)
+        self.pretty: bool = pretty
+
+        # Rules `data` fields in output order, each with the coercion for its CSV cell
+        self._rule_fields: Tuple[Tuple[str, Callable[[Any], Any]], ...] = (
+            ("color", self._to_str),
+            ("column", self._to_int),
+            ("DDF_target_value", self._null_if_blank_or_literal_null),
+            ("DDF_type", self._to_str),
+            ("DDF_unit", self._null_if_blank_or_literal_null),
+            ("inverse", self._to_int),
+            ("linker", self._null_if_blank_or_literal_null),
+            ("operator", self._to_str),
+            ("operator2", self._null_if_blank_or_literal_null),
+            ("parametertype_id", self._to_int),
+            ("regex_filter", self._null_if_blank_or_literal_null),
+            ("show", self._to_int),
+            ("spec_id", self._to_int),
+            ("text", self._null_if_blank_or_literal_null),
+            ("translations", self._null_if_blank_or_literal_null),
+            ("value", self._to_number_or_keep),
+            ("value2", self._null_if_blank_or_literal_null),
+        )
+
+    @functools.cached_property
+    def _today(self) -> str:
+        """YYYYMMDD stamp for output file names, fixed on first use so every file from this exporter shares it."""
+        return datetime.now().strftime("%Y%m%d")
 
     # --------------------------- Public API ---------------------------
 
@@ -64,19 +130,19 @@ class SpecsRulesExporter:
         if self.specs_csv is None and self.rules_csv is None:
             raise ValueError("Provide at least one of specs_csv or rules_csv.")
 
-        today = datetime.now().strftime("%Y%m%d")
+        today = self._today
         specs_path: Optional[Path] = None
         rules_path: Optional[Path] = None
 
         if self.specs_csv is not None:
-            specs_rows = self._read_csv(self.specs_csv)
-            specs_payload = self._build_specs_payload(specs_rows)
-            specs_path = self._save_json(specs_payload, self.out_dir / f"Specs_{today}.json")
+            specs_columns = self._read_csv(self.specs_csv)
+            specs_items = self._iter_specs_items(specs_columns)
+            specs_path = self._save_json("specs", specs_items, self.out_dir / f"Specs_{today}.json")
 
         if self.rules_csv is not None:
-            rules_rows = self._read_csv(self.rules_csv)
-            rules_payload = self._build_rules_payload(rules_rows)
-            rules_path = self._save_json(rules_payload, self.out_dir / f"Rules_{today}.json")
+            rules_columns = self._read_csv(self.rules_csv)
+            rules_items = self._iter_rules_items(rules_columns)
+            rules_path = self._save_json("rules", rules_items, self.out_dir / f"Rules_{today}.json")
 
         return ExportResult(specs_json=specs_path, rules_json=rules_path)
 
@@ -94,10 +160,9 @@ class SpecsRulesExporter:
         Path
             Written JSON path.
         """
-        rows = self._read_csv(Path(specs_csv))
-        payload = self._build_specs_payload(rows)
-        out = self.out_dir / f"Specs_{datetime.now().strftime('%Y%m%d')}.json"
-        return self._save_json(payload, out)
+        columns = self._read_csv(Path(specs_csv))
+        out = self.out_dir / f"Specs_{self._today}.json"
+        return self._save_json("specs", self._iter_specs_items(columns), out)
 
     def convert_rules(self, rules_csv: Union[str, Path]) -> Path:
         """
@@ -113,85 +178,77 @@ class SpecsRulesExporter:
         Path
             Written JSON path.
         """
-        rows = self._read_csv(Path(rules_csv))
-        payload = self._build_rules_payload(rows)
-        out = self.out_dir / f"Rules_{datetime.now().strftime('%Y%m%d')}.json"
-        return self._save_json(payload, out)
+        columns = self._read_csv(Path(rules_csv))
+        out = self.out_dir / f"Rules_{self._today}.json"
+        return self._save_json("rules", self._iter_rules_items(columns), out)
 
     # ------------------------- Building payloads -------------------------
 
-    def _build_specs_payload(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _iter_specs_items(self, columns: Columns) -> Iterator[Dict[str, Any]]:
         """
-        Match Apps Script behavior for Specs:
+        Yield the "specs" items one at a time, matching Apps Script behavior for Specs:
         - type/status/archiviert -> int (or null)
         - order -> None if blank or literal 'null', else keep string
         - translations -> JSON STRING of {"en": {...}} (same as Apps Script)
         """
-        items: List[Dict[str, Any]] = []
-        for row in rows:
-            name = self._to_str(row.get("name"))
-            item = {
+        names = self._coerce_column(columns, "name", self._to_str)
+        types = self._coerce_column(columns, "type", self._to_int)
+        statuses = self._coerce_column(columns, "status", self._to_int)
+        archived = self._coerce_column(columns, "archiviert", self._to_int)
+        orders = self._coerce_column(columns, "order", self._null_if_blank_or_literal_null)
+        translations = self._coerce_column(columns, "name", self._specs_translations)
+
+        rows = zip(names, types, statuses, archived, orders, translations)
+        for name, type_, status, archiviert, order, translations_json in rows:
+            yield {
                 "action": "create",
                 "data": {
                     "name": name,
-                    "type": self._to_int(row.get("type")),
-                    "status": self._to_int(row.get("status")),
-                    "archiviert": self._to_int(row.get("archiviert")),
-                    "order": self._null_if_blank_or_literal_null(row.get("order")),
+                    "type": type_,
+                    "status": status,
+                    "archiviert": archiviert,
+                    "order": order,
                     # Keep translations as JSON STRING
-                    "translations": json.dumps({
-                        "en": {
-                            "name": name,
-                            "DDF_Defaulttext_OK": "NULL",
-                            "DDF_Defaulttext_NOT_OK": "NULL",
-                            "DDF_Defaulttext_Toleranzbereich_NOT_OK": "NULL"
-                        }
-                    })
+                    "translations": translations_json,
                 }
             }
-            items.append(item)
-
-        return {"specs": items}
 
-    def _build_rules_payload(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _iter_rules_items(self, columns: Columns) -> Iterator[Dict[str, Any]]:
         """
-        Match Apps Script behavior for Rules:
+        Yield the "rules" items one at a time, matching Apps Script behavior for Rules:
         - Integers: column, inverse, parametertype_id, show, spec_id
         - DDF_target_value, DDF_unit, linker, operator2, regex_filter, text, translations, value2:
           -> None if blank/'null', else keep string
         - value: numeric if can parse, else keep as string (e.g. 'OK'); blank/'null' -> None
         """
-        items: List[Dict[str, Any]] = []
-        for row in rows:
-            data = {
-                "color": self._to_str(row.get("color")),
-                "column": self._to_int(row.get("column")),
-                "DDF_target_value": self._null_if_blank_or_literal_null(row.get("DDF_target_value")),
-                "DDF_type": self._to_str(row.get("DDF_type")),
-                "DDF_unit": self._null_if_blank_or_literal_null(row.get("DDF_unit")),
-                "inverse": self._to_int(row.get("inverse")),
-                "linker": self._null_if_blank_or_literal_null(row.get("linker")),
-                "operator": self._to_str(row.get("operator")),
-                "operator2": self._null_if_blank_or_literal_null(row.get("operator2")),
-                "parametertype_id": self._to_int(row.get("parametertype_id")),
-                "regex_filter": self._null_if_blank_or_literal_null(row.get("regex_filter")),
-                "show": self._to_int(row.get("show")),
-                "spec_id": self._to_int(row.get("spec_id")),
-                "text": self._null_if_blank_or_literal_null(row.get("text")),
-                "translations": self._null_if_blank_or_literal_null(row.get("translations")),
-                "value": self._to_number_or_keep(row.get("value")),
-                "value2": self._null_if_blank_or_literal_null(row.get("value2")),
-            }
-            items.append({"action": "create", "data": data})
+        keys = [key for key, _ in self._rule_fields]
+        coerced = [self._coerce_column(columns, key, coerce) for key, coerce in self._rule_fields]
+
+        for values in zip(*coerced):
+            yield {"action": "create", "data": dict(zip(keys, values))}
 
-        return {"rules": items}
+    def _specs_translations(self, name: Any) -> str:
+        """The Specs 'translations' JSON string for a raw name cell (one json.dumps per distinct name)."""
+        return _SPECS_TRANSLATIONS_PREFIX + json.dumps(self._to_str(name)) + _SPECS_TRANSLATIONS_SUFFIX
+
+    def _coerce_column(self, columns: Columns, key: str, coerce: Callable[[Any], Any]) -> List[Any]:
+        """
+        Coerce the `key` column a column at a time (a missing column reads as all None).
+        Columns repeat the same few raw cells (spec_id, show, operator, ...), so `coerce`
+        runs once per distinct raw value and every row reuses that result.
+        """
+        raw = columns.get(key)
+        if raw is None:
+            return [coerce(None)] * len(next(iter(columns.values()), ()))
+        coerced = {v: coerce(v) for v in set(raw)}
+        return [coerced[v] for v in raw]
 
     # --------------------------- I/O helpers ---------------------------
 
-    def _read_csv(self, path: Path) -> List[Dict[str, Any]]:
+    def _read_csv(self, path: Path) -> Columns:
         """
-        Read a CSV file into a list of dict rows (header -> cell).
-        Skips fully blank lines.
+        Read a CSV file column-wise (header -> cells), so the builders never
+        construct or look up a dict per row. Skips fully blank lines.
 
         Parameters
         ----------
@@ -200,32 +257,77 @@ class SpecsRulesExporter:
 
         Returns
         -------
-        List[Dict[str, Any]]
-            List of rows keyed by CSV headers.
+        Columns
+            One list of cells per CSV header, all the same length.
         """
         if not path.exists():
             raise FileNotFoundError(f"CSV not found: {path}")
 
-        rows: List[Dict[str, Any]] = []
+        if pacsv is not None:
+            arrow_columns = self._read_csv_arrow(path)
+            if arrow_columns is not None:
+                return arrow_columns
+
         with path.open("r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
-            for raw in reader:
-                if raw is None:
+            reader = csv.reader(f)
+            # like csv.DictReader: the header is the first non-empty line
+            header: List[str] = next((cells for cells in reader if cells), [])
+            width = len(header)
+            rows: List[List[Optional[str]]] = []
+            for cells in reader:
+                # fully blank: every cell missing or whitespace (stops at the first real cell)
+                if not any(v.strip() for v in cells[:width]):
                     continue
-                values_joined = "".join([(v or "") for v in raw.values()])
-                if values_joined.strip() == "":
-                    continue
-                rows.append(raw)
-        return rows
+                if len(cells) < width:
+                    cells += [None] * (width - len(cells))  # short rows pad with None, as DictReader does
+                rows.append(cells)
+
+        cells_by_column = zip(*rows) if rows else ([] for _ in header)
+        return {name: list(cells) for name, cells in zip(header, cells_by_column)}
 
-    def _save_json(self, payload: Dict[str, Any], out_path: Path) -> Path:
+    def _read_csv_arrow(self, path: Path) -> Optional[Columns]:
         """
-        Save payload as JSON with UTF-8 encoding and pretty indent.
+        Same columns as the csv.reader path in `_read_csv`, parsed by pyarrow's C reader.
+        Every column is read as a string so cells reach the coercion helpers unchanged.
+
+        Returns None for files pyarrow rejects (e.g. ragged rows) or whose header isn't
+        on the first line, so the caller falls back to csv.reader.
+        """
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            header = next(csv.reader(f), None)
+        if not header:
+            return None
+
+        try:
+            # memory-mapped: the parser reads the page cache directly instead of copying through a file buffer
+            with pa.memory_map(str(path)) as source:
+                table = pacsv.read_csv(
+                    source,
+                    parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                    convert_options=pacsv.ConvertOptions(column_types={name: pa.string() for name in header}),
+                )
+                columns = [col.to_pylist() for col in table.columns]
+        except pa.ArrowInvalid:
+            return None
+
+        # skip fully blank lines (every cell empty or whitespace)
+        keep = [i for i, values in enumerate(zip(*columns)) if any(v.strip() for v in values)]
+        if len(keep) < table.num_rows:
+            columns = [[col[i] for i in keep] for col in columns]
+        return dict(zip(header, columns))
+
+    def _save_json(self, root_key: str, items: Iterable[Dict[str, Any]], out_path: Path) -> Path:
+        """
+        Save {root_key: [items...]} as JSON with UTF-8 encoding (pretty indent unless self.pretty is False).
+        Items are serialized and written as they are produced, so the full payload
+        (and its encoded form) is never held in memory at once.
 
         Parameters
         ----------
-        payload : Dict[str, Any]
-            The data to serialize.
+        root_key : str
+            Top-level key ("specs" or "rules").
+        items : Iterable[Dict[str, Any]]
+            The items to serialize, in order.
         out_path : Path
             Where to write the file.
 
@@ -235,10 +337,49 @@ class SpecsRulesExporter:
             The written file path.
         """
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        with out_path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        if not self.pretty:
+            # Same document as json.dump({root_key: list(items)}, f, ensure_ascii=False, separators=(",", ":"))
+            # (orjson spells some floats differently, e.g. 1e16 for 1e+16)
+            with out_path.open("wb", buffering=1 << 20) as f:
+                f.write(b"{" + json.dumps(root_key).encode("utf-8") + b":[")
+                sep = b""
+                for item in items:
+                    f.write(sep)
+                    f.write(self._dump_item(item))
+                    sep = b","
+                f.write(b"]}")
+            return out_path
+
+        # Same document as json.dump({root_key: list(items)}, f, ensure_ascii=False, indent=2)
+        # (orjson spells some floats differently, e.g. 1e16 for 1e+16):
+        # each item is dumped on its own and re-indented to sit two levels deep.
+        # JSON strings never contain a raw newline, so splitting lines on b"\n" is safe.
+        with out_path.open("wb", buffering=1 << 20) as f:
+            f.write(b'{\n  ' + json.dumps(root_key).encode("utf-8") + b": [")
+            sep = b"\n    "
+            for item in items:
+                f.write(sep)
+                f.write(self._dump_item(item).replace(b"\n", b"\n    "))
+                sep = b",\n    "
+            # sep still at its initial value means no items: "[]" stays on one line
+            f.write(b"]\n}" if sep == b"\n    " else b"\n  ]\n}")
         return out_path
 
+    def _dump_item(self, item: Dict[str, Any]) -> bytes:
+        """
+        One item as UTF-8 JSON, 2-space indented or compact (orjson when installed, else stdlib json).
+        Items holding NaN/Infinity go to stdlib json, which writes them as such; orjson would write null.
+        """
+        if orjson is not None and not has_non_finite(item):
+            try:
+                return orjson.dumps(item, option=orjson.OPT_INDENT_2) if self.pretty else orjson.dumps(item)
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers wider than 64 bits (_to_int("1e30")), which stdlib json still handles
+        if self.pretty:
+            return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+        # without indent, json uses its C encoder
+        return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
     # ---------------------- Coercion / conversion ----------------------
 
     def _null_if_blank_or_literal_null(self, value: Any) -> Optional[str]:
@@ -248,8 +389,13 @@ class SpecsRulesExporter:
         """
         if value is None:
             return None
-        s = str(value).strip()
-        if s == "" or s.lower() == "null":
+        if not isinstance(value, str):
+            value = str(value)
+        s = value.strip()
+        if not s:
+            return None
+        # only a 4-character cell can spell null; skip lower() for everything else
+        if len(s) == 4 and s.lower() == "null":
             return None
         return s
 
@@ -259,7 +405,7 @@ class SpecsRulesExporter:
         Otherwise return None.
         """
         v = self._null_if_blank_or_literal_null(value)
-        if v is None:
+        if v is None or not _could_be_number(v):
             return None
         try:
             # allow floats like "3.0" to become 3
@@ -277,6 +423,8 @@ class SpecsRulesExporter:
         v = self._null_if_blank_or_literal_null(value)
         if v is None:
             return None
+        if not _could_be_number(v):
+            return v  # keep as string, without a failed float() first
         try:
             if v.isdigit() or (v.startswith("-") and v[1:].isdigit()):
                 return int(v)
@@ -305,13 +453,16 @@ if __name__ == "__main__":
     parser.add_argument("--specs", help="Path to Specs CSV", default=None)
     parser.add_argument("--rules", help="Path to Rules CSV", default=None)
     parser.add_argument("--out", default=".", help="Output directory (default: current directory)")
+    parser.add_argument("--compact", action="store_true", help="Write compact JSON instead of indented")
 
     args = parser.parse_args()
 
     if args.specs is None and args.rules is None:
         parser.error("You must provide at least one of --specs or --rules")
 
-    exporter = SpecsRulesExporter(specs_csv=args.specs, rules_csv=args.rules, out_dir=args.out)
+    exporter = SpecsRulesExporter(
+        specs_csv=args.specs, rules_csv=args.rules, out_dir=args.out, pretty=not args.compact
+    )
     result = exporter.run()
 
     if result.specs_json:
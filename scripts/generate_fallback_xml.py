@@ -1,16 +1,61 @@
 import argparse
 import json
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import re
 import sys
 import os
+from collections import defaultdict
+
+try:
+    from lxml import etree as ET
+    _LXML = True
+except ImportError:  # optional: xml.etree builds the same document, just slower to serialize
+    import xml.etree.ElementTree as ET
+    _LXML = False
+
+# The last run of digits in a package name (e.g., "Name_123" -> "123")
+_TRAILING_DIGITS = re.compile(r'\d+$')
+
+# <Probe> child tags, in output order, and the JSON key each one is read from
+_PROBE_FIELDS = [
+    ("Probe_Nr_extern", "Probe_Nr_extern"),
+    ("Probenbezeichnung", "Probenbezeichnung"),
+    ("Probenahmedatum", "Probenahmedatum"),
+    ("Artikelbezeichnung", "Artikelbezeichnung"),
+    ("Charge", "Charge"),
+    ("MHD", "MHD"),
+    ("Probenbemerkung", "Probenbemerkung"),
+    # Mapping specific Info_extern keys based on JS logic
+    ("Probe_Info_extern_03", "Info_extern_03"),
+    ("Probe_Info_extern_04", "Info_extern_04"),
+]
+
+def element_text(value):
+    """The text to write for a JSON value, or None if it is empty or blank."""
+    if not value:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    # line breaks as "\n" (what a parser reads back from a raw "\r\n"); lxml would keep "\r" as &#13;
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def analyse_attributes(row):
+    """Info_extern_01/02 attributes for an <Analyse>, from the row's Para_Info_extern_01/02."""
+    attrs = {}
+    info_01 = row.get('Para_Info_extern_01')
+    if info_01:
+        attrs['Info_extern_01'] = str(info_01)
+    info_02 = row.get('Para_Info_extern_02')
+    if info_02:
+        attrs['Info_extern_02'] = str(info_02)
+    return attrs
 
 def create_xml_element(parent, tag, text=None, attributes=None):
     """Helper to create an XML element with optional text and attributes."""
     elem = ET.SubElement(parent, tag, attributes if attributes else {})
-    if text and str(text).strip():
-        elem.text = str(text).strip()
+    text = element_text(text)
+    if text:
+        elem.text = text
     return elem
 
 def generate_gba_xml(input_path, output_path):
@@ -30,11 +75,16 @@ def generate_gba_xml(input_path, output_path):
         sys.exit(1)
 
     # 2. Initialize Root Element <Auftrag>
-    # We manually set the attributes to ensure namespaces appear exactly as required
-    root = ET.Element("Auftrag", {
-        "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
-        "xmlns:xsd": "http://www.w3.org/2001/XMLSchema"
-    })
+    # We manually set the namespaces to ensure they appear exactly as required
+    namespaces = {
+        "xsi": "http://www.w3.org/2001/XMLSchema-instance",
+        "xsd": "http://www.w3.org/2001/XMLSchema"
+    }
+    if _LXML:
+        # lxml only accepts namespace declarations through nsmap
+        root = ET.Element("Auftrag", nsmap=namespaces)
+    else:
+        root = ET.Element("Auftrag", {f"xmlns:{prefix}": uri for prefix, uri in namespaces.items()})
 
     # 3. Add Header Information
     # Hardcoded based on your JS implementation
@@ -47,15 +97,12 @@ def generate_gba_xml(input_path, output_path):
 
     # 4. Group Data by Sample (Probe_Nr_extern)
     # The SQL returns flat rows; we need to group them into Samples -> Analyses
-    samples_map = {}
+    # (dicts keep first-seen order, so samples come out in input order)
+    samples_map = defaultdict(list)
     for row in data:
         p_id = row.get('Probe_Nr_extern')
-        if not p_id:
-            continue 
-            
-        if p_id not in samples_map:
-            samples_map[p_id] = []
-        samples_map[p_id].append(row)
+        if p_id:
+            samples_map[p_id].append(row)
 
     # 5. Iterate through Groups to build <Probe> tags
     for p_id, rows in samples_map.items():
@@ -66,23 +113,10 @@ def generate_gba_xml(input_path, output_path):
         
         # Map JSON keys to XML tags
         # Only creates tags if value exists (mimicking the JS 'if' checks)
-        fields_map = [
-            ("Probe_Nr_extern", "Probe_Nr_extern"),
-            ("Probenbezeichnung", "Probenbezeichnung"),
-            ("Probenahmedatum", "Probenahmedatum"),
-            ("Artikelbezeichnung", "Artikelbezeichnung"),
-            ("Charge", "Charge"),
-            ("MHD", "MHD"),
-            ("Probenbemerkung", "Probenbemerkung"),
-            # Mapping specific Info_extern keys based on JS logic
-            ("Probe_Info_extern_03", "Info_extern_03"),
-            ("Probe_Info_extern_04", "Info_extern_04"),
-        ]
-
-        for json_key, xml_tag in fields_map:
-            val = probe_data.get(json_key)
-            if val and str(val).strip():
-                create_xml_element(probe_elem, xml_tag, val)
+        for json_key, xml_tag in _PROBE_FIELDS:
+            text = element_text(probe_data.get(json_key))
+            if text:
+                ET.SubElement(probe_elem, xml_tag).text = text
 
         # --- Analysis Scope ---
         scope_elem = ET.SubElement(probe_elem, "Analysenumfang")
@@ -91,6 +125,9 @@ def generate_gba_xml(input_path, output_path):
         # Extracted from 'Pakete' column in the first row
         raw_packages = probe_data.get('Pakete', '')
         if raw_packages:
+            # Every package <Analyse> carries the first row's attributes
+            package_attrs = analyse_attributes(probe_data)
+
             # Split by comma
             package_list = raw_packages.split(',')
             for pkg_str in package_list:
@@ -98,48 +135,28 @@ def generate_gba_xml(input_path, output_path):
                 if not pkg_str: 
                     continue
                 
-                # Regex: matches the last sequence of digits (e.g., "Name_123" -> "123")
-                match = re.search(r'\d+$', pkg_str)
+                match = _TRAILING_DIGITS.search(pkg_str)
                 
                 if match:
-                    paket_id = match.group(0)
-                    
-                    # Prepare attributes dictionary
-                    attrs = {}
-                    if probe_data.get('Para_Info_extern_01'):
-                        attrs['Info_extern_01'] = str(probe_data.get('Para_Info_extern_01'))
-                    if probe_data.get('Para_Info_extern_02'):
-                        attrs['Info_extern_02'] = str(probe_data.get('Para_Info_extern_02'))
-
                     # Create <Analyse> tag
-                    analyse_elem = create_xml_element(scope_elem, "Analyse", attributes=attrs)
-                    create_xml_element(analyse_elem, "Pruefpaket_ID", paket_id)
+                    analyse_elem = ET.SubElement(scope_elem, "Analyse", package_attrs)
+                    ET.SubElement(analyse_elem, "Pruefpaket_ID").text = match.group(0)
 
         # B. HANDLE PARAMETERS (Pruefmethode_ID)
         # Iterate through ALL rows for this sample to catch individual methods
         for row in rows:
-            method_id = row.get('Pruefmethode_ID')
+            method_id = element_text(row.get('Pruefmethode_ID'))
             
             # Only add if ID exists and is not empty
-            if method_id and str(method_id).strip():
-                
-                # Prepare attributes dictionary (from the specific row)
-                attrs = {}
-                if row.get('Para_Info_extern_01'):
-                    attrs['Info_extern_01'] = str(row.get('Para_Info_extern_01'))
-                if row.get('Para_Info_extern_02'):
-                    attrs['Info_extern_02'] = str(row.get('Para_Info_extern_02'))
-                
-                # Create <Analyse> tag
-                analyse_elem = create_xml_element(scope_elem, "Analyse", attributes=attrs)
-                create_xml_element(analyse_elem, "Pruefmethode_ID", method_id)
+            if method_id:
+                # Create <Analyse> tag (attributes from the specific row)
+                analyse_elem = ET.SubElement(scope_elem, "Analyse", analyse_attributes(row))
+                ET.SubElement(analyse_elem, "Pruefmethode_ID").text = method_id
 
     # 6. Format and Write Output
-    # minidom is used to make the XML "pretty" (indented)
-    xml_str = minidom.parseString(ET.tostring(root, encoding='utf-8')).toprettyxml(indent="  ")
-    
-    # Fix minidom's tendency to add extra newlines between tags
-    xml_str = os.linesep.join([s for s in xml_str.splitlines() if s.strip()])
+    # ET.indent makes the XML "pretty" (indented) in place, without re-parsing it
+    ET.indent(root, space="  ")
+    xml_str = '<?xml version="1.0" ?>\n' + ET.tostring(root, encoding='unicode')
 
     try:
         # Ensure output directory exists
@@ -49,28 +49,20 @@ def generate_rules(
         )
 
     # Apply target and spec_id
-    for i in range(param_count):
-        target_value: float = targets[i]
-
-        # Each parameter has 2 rules: perfect + not OK
-        perfect_rule_index: int = i * 2
-        not_ok_rule_index: int = perfect_rule_index + 1
-
-        # perfect rule
-        perfect_rule: Dict[str, Any] = rules[perfect_rule_index]
-        perfect_rule_data: Dict[str, Any] = perfect_rule.get("data", {})
-        perfect_rule_data["spec_id"] = spec_id
-        perfect_rule_data["value"] = target_value
-        perfect_rule_data["DDF_target_value"] = target_value
-        perfect_rule["data"] = perfect_rule_data
-
-        # not OK rule
-        not_ok_rule: Dict[str, Any] = rules[not_ok_rule_index]
-        not_ok_rule_data: Dict[str, Any] = not_ok_rule.get("data", {})
-        not_ok_rule_data["spec_id"] = spec_id
-        not_ok_rule_data["value"] = target_value
-        not_ok_rule_data["DDF_target_value"] = target_value
-        not_ok_rule["data"] = not_ok_rule_data
+    # Each parameter has 2 rules (perfect + not OK), so rules i and i + 1 (i even) share targets[i // 2].
+    # Keys already in "data" keep their position; missing ones are appended, as item assignment would.
+    rules = [
+        dict(
+            rule,
+            data=dict(
+                rule.get("data", {}),
+                spec_id=spec_id,
+                value=targets[i // 2],
+                DDF_target_value=targets[i // 2],
+            ),
+        )
+        for i, rule in enumerate(rules)
+    ]
 
     # Write final output
     output_obj: Dict[str, Any] = {"rules": rules}
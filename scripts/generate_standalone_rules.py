@@ -23,10 +23,19 @@ python generate_standalone_rules.py \
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json writes the same rules, just slower
+    orjson = None
+
+from rules_json_core import has_non_finite
 
 
 Mode = Literal[
@@ -39,7 +48,7 @@ Mode = Literal[
 ]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ParamSpec:
     parametertype_id: int
     target: Optional[float]
@@ -55,8 +64,29 @@ def r2(x: float) -> float:
     return round(x, 2)
 
 
-def base_data(
-    *,
+# Every rule's data, in output key order, with the fields that never vary filled in
+_TEMPLATE: Dict[str, Any] = {
+    "color": None,
+    "column": 0,
+    "DDF_target_value": None,
+    "DDF_type": None,
+    "DDF_unit": None,
+    "inverse": 0,
+    "linker": None,
+    "operator": None,
+    "operator2": None,
+    "parametertype_id": None,
+    "regex_filter": None,
+    "show": 1,
+    "spec_id": None,
+    "text": None,
+    "translations": None,
+    "value": None,
+    "value2": None,
+}
+
+
+def _emit(
     parametertype_id: int,
     spec_id: int,
     unit: Optional[str],
@@ -68,171 +98,107 @@ def base_data(
     operator2: Optional[str] = None,
     value2: Any = None,
     linker: Optional[Literal["AND", "OR"]] = None,
+    /,
 ) -> Dict[str, Any]:
-
-    return {
-        "color": color,
-        "column": 0,
-        "DDF_target_value": target,
-        "DDF_type": ddf_type,
-        "DDF_unit": unit,
-        "inverse": 0,
-        "linker": linker,
-        "operator": operator,
-        "operator2": operator2,
-        "parametertype_id": parametertype_id,
-        "regex_filter": None,
-        "show": 1,
-        "spec_id": spec_id,
-        "text": None,
-        "translations": None,
-        "value": value,
-        "value2": value2,
-    }
-
-
-def make_rule(data: Dict[str, Any]) -> Dict[str, Any]:
+    # one "create" rule per call; copying the template keeps its key order; only the varying fields are then set
+    data = _TEMPLATE.copy()
+    data["color"] = color
+    data["DDF_target_value"] = target
+    data["DDF_type"] = ddf_type
+    data["DDF_unit"] = unit
+    data["linker"] = linker
+    data["operator"] = operator
+    data["operator2"] = operator2
+    data["parametertype_id"] = parametertype_id
+    data["spec_id"] = spec_id
+    data["value"] = value
+    data["value2"] = value2
     return {"action": "create", "data": data}
 
 
 # ---------------------------------
-# Active band calculation
+# Band calculation
 # ---------------------------------
 
-@dataclass(frozen=True)
-class ActiveBands:
-    low_ok: float
-    low_perfect: float
-    high_perfect: float
-    high_ok2: float
-
-
-def compute_active_bands(target: float) -> ActiveBands:
-    return ActiveBands(
-        low_ok=r2(0.80 * target),
-        low_perfect=r2(0.90 * target),
-        high_perfect=r2(1.25 * target),
-        high_ok2=r2(1.50 * target),
+# (low_ok, low_perfect, high_perfect, high_ok2); a plain tuple, unpacked by the builders
+ActiveBands = Tuple[float, float, float, float]
+
+# Band edges as multiples of the target, in ActiveBands order
+_BAND_FACTORS: Dict[str, Tuple[float, float, float, float]] = {
+    "active": (0.80, 0.90, 1.25, 1.50),
+    "mineral": (0.80, 0.90, 1.25, 1.45),  # mineral-specific change: upper OK band ends at 1.45*T
+}
+
+
+# Band/threshold results are cached per target, which often repeats across params
+# (100, 1000, ...); tuples are immutable, so a cached result is safe to share.
+@functools.lru_cache(maxsize=256)
+def compute_bands(mode: Mode, target: float) -> ActiveBands:
+    low_ok, low_perfect, high_perfect, high_ok2 = _BAND_FACTORS[mode]
+    return (
+        r2(low_ok * target),
+        r2(low_perfect * target),
+        r2(high_perfect * target),
+        r2(high_ok2 * target),
     )
 
 
 # ---------------------------------
-# Mineral band calculation
+# Limit3 threshold calculation
 # ---------------------------------
 
-def compute_mineral_bands(target: float) -> ActiveBands:
-    return ActiveBands(
-        low_ok=r2(0.80 * target),
-        low_perfect=r2(0.90 * target),
-        high_perfect=r2(1.25 * target),
-        high_ok2=r2(1.45 * target),  # mineral-specific change
-    )
+@functools.lru_cache(maxsize=256)
+def limit3_threshold(target: float) -> float:
+    return r2(0.30 * target)
 
 
 # ---------------------------------
 # Rule builders
 # ---------------------------------
 
-def build_active_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
-    pid = ps.parametertype_id
-    t = float(ps.target)
-    unit = ps.unit
+# The four banded rules (active, mineral):
+# (ddf_type, color, operator, value band, operator2, value2 band, linker), bands indexing ActiveBands
+_BAND_RULES = (
+    ("perfect", "green", ">=", 1, "<=", 2, "AND"),  # low_perfect .. high_perfect
+    ("OK", "orange", ">=", 0, "<", 1, "AND"),       # low_ok .. below low_perfect
+    ("OK", "orange", ">", 2, "<=", 3, "AND"),       # above high_perfect .. high_ok2
+    ("not OK", "red", "<", 0, ">", 3, "OR"),        # below low_ok or above high_ok2
+)
+
+
+def build_zero_target_rules(pid: int, spec_id: int, unit: Optional[str], t: float) -> List[Dict[str, Any]]:
+    # a zero target leaves no bands: perfect at 0, not OK above it
+    perfect = _emit(
+        pid, spec_id, unit, t,
+        "perfect", "green",
+        "<=", 0.0,
+    )
+    not_ok = _emit(
+        pid, spec_id, unit, t,
+        "not OK", "red",
+        ">", 0.0,
+    )
+    return [perfect, not_ok]
 
-    if t == 0:
-        perfect = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="perfect", color="green",
-            operator="<=", value=0.0
-        ))
-        not_ok = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="not OK", color="red",
-            operator=">", value=0.0
-        ))
-        return [perfect, not_ok]
-
-    b = compute_active_bands(t)
-
-    perfect = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="perfect", color="green",
-        operator=">=", operator2="<=", linker="AND",
-        value=b.low_perfect, value2=b.high_perfect
-    ))
-
-    ok_low = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="OK", color="orange",
-        operator=">=", operator2="<", linker="AND",
-        value=b.low_ok, value2=b.low_perfect
-    ))
-
-    ok_high = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="OK", color="orange",
-        operator=">", operator2="<=", linker="AND",
-        value=b.high_perfect, value2=b.high_ok2
-    ))
-
-    not_ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="not OK", color="red",
-        operator="<", operator2=">", linker="OR",
-        value=b.low_ok, value2=b.high_ok2
-    ))
-
-    return [perfect, ok_low, ok_high, not_ok]
-
-
-def build_mineral_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
+
+def build_banded_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
     pid = ps.parametertype_id
     t = float(ps.target)
     unit = ps.unit
 
     if t == 0:
-        perfect = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="perfect", color="green",
-            operator="<=", value=0.0
-        ))
-        not_ok = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="not OK", color="red",
-            operator=">", value=0.0
-        ))
-        return [perfect, not_ok]
-
-    b = compute_mineral_bands(t)
-
-    perfect = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="perfect", color="green",
-        operator=">=", operator2="<=", linker="AND",
-        value=b.low_perfect, value2=b.high_perfect
-    ))
-
-    ok_low = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="OK", color="orange",
-        operator=">=", operator2="<", linker="AND",
-        value=b.low_ok, value2=b.low_perfect
-    ))
-
-    ok_high = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="OK", color="orange",
-        operator=">", operator2="<=", linker="AND",
-        value=b.high_perfect, value2=b.high_ok2
-    ))
-
-    not_ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="not OK", color="red",
-        operator="<", operator2=">", linker="OR",
-        value=b.low_ok, value2=b.high_ok2
-    ))
-
-    return [perfect, ok_low, ok_high, not_ok]
+        return build_zero_target_rules(pid, spec_id, unit, t)
+
+    bands = compute_bands(ps.mode, t)
+
+    return [
+        _emit(
+            pid, spec_id, unit, t,
+            ddf_type, color,
+            operator, bands[value_band], operator2, bands[value2_band], linker,
+        )
+        for ddf_type, color, operator, value_band, operator2, value2_band, linker in _BAND_RULES
+    ]
 
 
 # ---------------------------------
@@ -245,38 +211,27 @@ def build_limit3_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
     unit = ps.unit
 
     if t == 0:
-        perfect = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="perfect", color="green",
-            operator="<=", value=0.0
-        ))
-        not_ok = make_rule(base_data(
-            parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-            ddf_type="not OK", color="red",
-            operator=">", value=0.0
-        ))
-        return [perfect, not_ok]
-
-    threshold_perfect = r2(0.30 * t)
-
-    perfect = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="perfect", color="green",
-        operator="<=", value=threshold_perfect
-    ))
-
-    ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="OK", color="orange",
-        operator=">=", operator2="<=", linker="AND",
-        value=threshold_perfect, value2=r2(t)
-    ))
-
-    not_ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="not OK", color="red",
-        operator=">", value=r2(t)
-    ))
+        return build_zero_target_rules(pid, spec_id, unit, t)
+
+    threshold_perfect = limit3_threshold(t)
+
+    perfect = _emit(
+        pid, spec_id, unit, t,
+        "perfect", "green",
+        "<=", threshold_perfect,
+    )
+
+    ok = _emit(
+        pid, spec_id, unit, t,
+        "OK", "orange",
+        ">=", threshold_perfect, "<=", r2(t), "AND",
+    )
+
+    not_ok = _emit(
+        pid, spec_id, unit, t,
+        "not OK", "red",
+        ">", r2(t),
+    )
 
     return [perfect, ok, not_ok]
 
@@ -286,17 +241,17 @@ def build_limit2_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
     t = float(ps.target)
     unit = ps.unit
 
-    perfect = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="perfect", color="green",
-        operator="<=", value=r2(t)
-    ))
+    perfect = _emit(
+        pid, spec_id, unit, t,
+        "perfect", "green",
+        "<=", r2(t),
+    )
 
-    not_ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="not OK", color="red",
-        operator=">", value=r2(t)
-    ))
+    not_ok = _emit(
+        pid, spec_id, unit, t,
+        "not OK", "red",
+        ">", r2(t),
+    )
 
     return [perfect, not_ok]
 
@@ -306,18 +261,17 @@ def build_qualitative_rules(ps: ParamSpec, spec_id: int, qual_en: str, qual_de:
     t = float(ps.target)
     unit = ps.unit
 
-    perfect = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="perfect", color="green",
-        operator="=", operator2="=", linker="OR",
-        value=qual_en, value2=qual_de
-    ))
+    perfect = _emit(
+        pid, spec_id, unit, t,
+        "perfect", "green",
+        "=", qual_en, "=", qual_de, "OR",
+    )
 
-    not_ok = make_rule(base_data(
-        parametertype_id=pid, spec_id=spec_id, unit=unit, target=t,
-        ddf_type="not OK", color="red",
-        operator=">", value=r2(t)
-    ))
+    not_ok = _emit(
+        pid, spec_id, unit, t,
+        "not OK", "red",
+        ">", r2(t),
+    )
 
     return [perfect, not_ok]
 
@@ -325,20 +279,26 @@ def build_qualitative_rules(ps: ParamSpec, spec_id: int, qual_en: str, qual_de:
 def build_dummy_rules(ps: ParamSpec, spec_id: int) -> List[Dict[str, Any]]:
     pid = ps.parametertype_id
 
-    rule = make_rule(base_data(
-        parametertype_id=pid,
-        spec_id=spec_id,
-        unit=None,
-        target=None,
-        ddf_type="perfect",
-        color="green",
-        operator="!=",
-        value='""',
-    ))
+    rule = _emit(
+        pid, spec_id, None, None,
+        "perfect", "green",
+        "!=", '""',
+    )
 
     return [rule]
 
 
+# Rules each mode emits for a target (for the summary)
+RULE_COUNTS: Dict[str, Callable[[Optional[float]], int]] = {
+    "active": lambda t: 2 if t == 0 else 4,
+    "mineral": lambda t: 2 if t == 0 else 4,
+    "limit3": lambda t: 2 if t == 0 else 3,
+    "limit2": lambda t: 2,
+    "qualitative": lambda t: 2,
+    "dummy": lambda t: 1,
+}
+
+
 # ---------------------------------
 # CLI parsing
 # ---------------------------------
@@ -376,6 +336,9 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+_MODES = frozenset(("active", "mineral", "limit3", "limit2", "qualitative", "dummy"))
+
+
 def parse_param(raw: List[str]) -> ParamSpec:
     pid_str, target_str, unit_str, mode_str = raw
 
@@ -384,15 +347,16 @@ def parse_param(raw: List[str]) -> ParamSpec:
     except ValueError as e:
         raise ValueError(f"Invalid parametertype_id '{pid_str}'. Must be int.") from e
 
-    mode = mode_str.strip().lower()
-    if mode not in ("active", "mineral", "limit3", "limit2", "qualitative", "dummy"):
+    # modes are usually given already lowercase, so normalize only on a miss
+    mode = mode_str if mode_str in _MODES else mode_str.strip().lower()
+    if mode not in _MODES:
         raise ValueError(f"Invalid mode '{mode_str}'.")
 
     # target
     if target_str.lower() == "null":
         target = None
     else:
-        t_norm = target_str.replace(",", ".")
+        t_norm = target_str.replace(",", ".") if "," in target_str else target_str
         try:
             target = float(t_norm)
         except ValueError as e:
@@ -426,66 +390,71 @@ def main() -> None:
 
     qual_en, qual_de = args.qual if args.qual else ("", "")
 
-    all_rules: List[Dict[str, Any]] = []
+    builders: Dict[str, Callable[[ParamSpec, int], List[Dict[str, Any]]]] = {
+        "active": build_banded_rules,
+        "mineral": build_banded_rules,
+        "limit3": build_limit3_rules,
+        "limit2": build_limit2_rules,
+        "qualitative": lambda ps, sid: build_qualitative_rules(ps, sid, qual_en, qual_de),
+        "dummy": build_dummy_rules,
+    }
 
-    for ps in param_specs:
-        if ps.mode == "active":
-            if ps.target is None:
-                raise SystemExit("Active requires numeric target.")
-            rules = build_active_rules(ps, spec_id)
-
-        elif ps.mode == "mineral":
-            if ps.target is None:
-                raise SystemExit("Mineral requires numeric target.")
-            rules = build_mineral_rules(ps, spec_id)
-
-        elif ps.mode == "limit3":
-            if ps.target is None:
-                raise SystemExit("Limit3 requires numeric target.")
-            rules = build_limit3_rules(ps, spec_id)
-
-        elif ps.mode == "limit2":
-            if ps.target is None:
-                raise SystemExit("Limit2 requires numeric target.")
-            rules = build_limit2_rules(ps, spec_id)
-
-        elif ps.mode == "qualitative":
-            if ps.target is None:
-                raise SystemExit("Qualitative requires numeric target.")
-            rules = build_qualitative_rules(ps, spec_id, qual_en, qual_de)
-
-        elif ps.mode == "dummy":
-            rules = build_dummy_rules(ps, spec_id)
-
-        else:
-            raise ValueError(f"Unsupported mode: {ps.mode}")
+    # Params with the same (mode, unit, target) get the same rules up to parametertype_id:
+    # build them for the first such param and copy them, pid patched, for the rest.
+    # (str() of the target keeps -0.0 apart from 0.0, which would otherwise compare equal.)
+    built: Dict[Tuple[str, Optional[str], str], List[Dict[str, Any]]] = {}
 
-        all_rules.extend(rules)
+    def rules_for(ps: ParamSpec) -> List[Dict[str, Any]]:
+        build = builders.get(ps.mode)
+        if build is None:
+            raise ValueError(f"Unsupported mode: {ps.mode}")
+        if ps.mode != "dummy" and ps.target is None:
+            raise SystemExit(f"{ps.mode.capitalize()} requires numeric target.")
+
+        key = (ps.mode, ps.unit, str(ps.target))
+        templates = built.get(key)
+        if templates is None:
+            templates = built[key] = build(ps, spec_id)
+            return templates
+
+        pid = ps.parametertype_id
+        rules = []
+        for template in templates:
+            data = template["data"].copy()
+            data["parametertype_id"] = pid
+            rules.append({"action": "create", "data": data})
+        return rules
+
+    # one list built by chain in C, rather than a Python loop of extend() calls
+    all_rules: List[Dict[str, Any]] = list(itertools.chain.from_iterable(map(rules_for, param_specs)))
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump({"rules": all_rules}, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    # orjson (when installed) encodes in C; it would write a NaN/Infinity target as null,
+    # so rules holding one are left to stdlib json
+    data: Optional[bytes] = None
+    if orjson is not None and not has_non_finite(all_rules):
+        try:
+            data = orjson.dumps(
+                {"rules": all_rules},
+                option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+            )
+        except orjson.JSONEncodeError:
+            pass  # a parametertype_id wider than 64 bits, which stdlib json still handles
+
+    if data is None:
+        # encoded whole too, instead of json.dump's many small writes through the file buffer
+        text = json.dumps({"rules": all_rules}, ensure_ascii=False, indent=2) + "\n"
+        data = text.encode("utf-8")
+
+    out_path.write_bytes(data)
 
     print(f"Wrote {len(all_rules)} rules to {out_path}")
 
     # summary
     for ps in param_specs:
-        if ps.mode == "active":
-            n = 2 if ps.target == 0 else 4
-        elif ps.mode == "mineral":
-            n = 2 if ps.target == 0 else 4
-        elif ps.mode == "limit3":
-            n = 2 if ps.target == 0 else 3
-        elif ps.mode == "limit2":
-            n = 2
-        elif ps.mode == "qualitative":
-            n = 2
-        elif ps.mode == "dummy":
-            n = 1
-        else:
-            n = 0
+        count = RULE_COUNTS.get(ps.mode)
+        n = count(ps.target) if count is not None else 0
 
         print(f"  param {ps.parametertype_id} ({ps.mode}) -> {n} rules")
 
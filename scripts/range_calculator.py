@@ -23,16 +23,17 @@ Behavior:
 
 from __future__ import annotations
 
-import argparse
-from dataclasses import dataclass
-from typing import Dict, Literal
+import sys
+from typing import TYPE_CHECKING, Dict, List, Literal, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import argparse
 
 
 TypeMode = Literal["active", "limit"]
 
 
-@dataclass(frozen=True)
-class ActiveBands:
+class ActiveBands(NamedTuple):
     low_ok: float        # 0.80 * target
     low_perfect: float   # 0.90 * target
     high_perfect: float  # 1.25 * target
@@ -58,28 +59,60 @@ def print_active_ranges(target: float) -> None:
     """Print the ranges for type=active with two-decimal formatting."""
     bands: ActiveBands = compute_active_bands(target)
 
-    print(f"perfect_range: {fmt(bands.low_perfect)} - {fmt(bands.high_perfect)}")
-    print(f"okay_range: {fmt(bands.low_ok)} - {fmt(bands.low_perfect)}")
-    print(f"okay_range_2: {fmt(bands.high_perfect)} - {fmt(bands.high_ok2)}")
-    print(f"not_okay_range: <{fmt(bands.low_ok)} OR >{fmt(bands.high_ok2)}")
+    # each band edge is formatted once; the report goes out in a single write
+    low_ok = fmt(bands.low_ok)
+    low_perfect = fmt(bands.low_perfect)
+    high_perfect = fmt(bands.high_perfect)
+    high_ok2 = fmt(bands.high_ok2)
+    sys.stdout.write(
+        f"perfect_range: {low_perfect} - {high_perfect}\n"
+        f"okay_range: {low_ok} - {low_perfect}\n"
+        f"okay_range_2: {high_perfect} - {high_ok2}\n"
+        f"not_okay_range: <{low_ok} OR >{high_ok2}\n"
+    )
 
 
 def print_limit_ranges(target: float) -> None:
     """Print the ranges for type=limit with two-decimal formatting."""
-    threshold_perfect: float = 0.30 * target
+    threshold_perfect: str = fmt(0.30 * target)
+    limit: str = fmt(target)
 
-    print(f"perfect_range: <= {fmt(threshold_perfect)}")
-    print(f"okay_range: {fmt(threshold_perfect)} - {fmt(target)}")
-    print(f"not_okay_range: > {fmt(target)}")
+    sys.stdout.write(
+        f"perfect_range: <= {threshold_perfect}\n"
+        f"okay_range: {threshold_perfect} - {limit}\n"
+        f"not_okay_range: > {limit}\n"
+    )
 
 
 def print_zero_target_special_case() -> None:
     """Special handling when target == 0."""
-    print("perfect_range: 0.00")
-    print("not_okay_range: > 0.00")
+    sys.stdout.write("perfect_range: 0.00\nnot_okay_range: > 0.00\n")
+
+
+def parse_args_fast(argv: List[str]) -> Optional[Tuple[float, TypeMode]]:
+    """
+    (target, type) for the plain '--target X --type T' form (either order), without
+    importing argparse; None for anything else (help, '--target=X', errors, ...),
+    which parse_args then handles.
+    """
+    if len(argv) != 4:
+        return None
+    values: Dict[str, str] = {argv[0]: argv[1], argv[2]: argv[3]}
+    raw_target = values.get("--target")
+    mode = values.get("--type")
+    # a leading "-" may be read as an option by argparse ("-1e5"): leave those to it
+    if raw_target is None or raw_target.startswith("-") or mode not in ("active", "limit"):
+        return None
+    try:
+        target = float(raw_target)
+    except ValueError:
+        return None
+    return target, mode  # type: ignore[return-value]
 
 
 def parse_args() -> argparse.Namespace:
+    import argparse  # only needed off the parse_args_fast path
+
     parser = argparse.ArgumentParser(
         description="Calculate quality ranges around a target using fixed rules."
     )
@@ -101,9 +134,13 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> None:
-    args = parse_args()
-    target: float = args.target
-    mode: TypeMode = args.type  # type: ignore[assignment]
+    fast = parse_args_fast(sys.argv[1:])
+    if fast is not None:
+        target, mode = fast
+    else:
+        args = parse_args()
+        target = args.target
+        mode = args.type
 
     # Special case for target == 0
     if target == 0:
@@ -1,25 +1,35 @@
 #!/usr/bin/env python3
-import json
 import argparse
 from typing import Any, Dict, List
 
-def remove_params_from_json(input_path: str, param_ids: List[int], output_path: str) -> None:
+from rules_json_core import load_json, write_json
+
+# Stand-in "data" for rules without one (shared, never modified)
+_EMPTY: Dict[str, Any] = {}
+
+def remove_params_from_json(
+    input_path: str, param_ids: List[int], output_path: str, *, pretty: bool = True
+) -> None:
     """Remove all rules from a JSON file where data.parametertype_id matches any in param_ids."""
-    with open(input_path, "r", encoding="utf-8") as infile:
-        data: Dict[str, Any] = json.load(infile)
+    data: Dict[str, Any] = load_json(input_path)
 
     if "rules" not in data or not isinstance(data["rules"], list):
         raise ValueError("Invalid JSON format: missing 'rules' list")
 
-    original_count: int = len(data["rules"])
-    data["rules"] = [
-        rule for rule in data["rules"]
-        if rule.get("data", {}).get("parametertype_id") not in param_ids
-    ]
-    removed_count: int = original_count - len(data["rules"])
+    rules: List[Any] = data["rules"]
+    original_count: int = len(rules)
+    param_id_set = frozenset(param_ids)  # one hash lookup per rule instead of a scan of the list
+
+    # Compact the kept rules to the front of the same list, then cut off the tail
+    kept: int = 0
+    for rule in rules:
+        if rule.get("data", _EMPTY).get("parametertype_id") not in param_id_set:
+            rules[kept] = rule
+            kept += 1
+    del rules[kept:]
+    removed_count: int = original_count - kept
 
-    with open(output_path, "w", encoding="utf-8") as outfile:
-        json.dump(data, outfile, indent=2, ensure_ascii=False)
+    write_json(data, output_path, trailing_newline=False, pretty=pretty)
 
     removed_list = ", ".join(map(str, param_ids))
     print(f"Removed {removed_count} rule(s) with parametertype_id in [{removed_list}]")
@@ -35,6 +45,8 @@ def main() -> None:
     parser.add_argument("--out", help="Path to output JSON file (omit if using --in-place)")
     parser.add_argument("--in-place", action="store_true",
                         help="Modify the input file in place instead of writing a new file")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write compact JSON instead of indented (much faster without orjson)")
 
     args = parser.parse_args()
 
@@ -46,7 +58,7 @@ def main() -> None:
             parser.error("You must specify --out unless using --in-place")
         output_path = args.out
 
-    remove_params_from_json(args.input, args.param_id, output_path)
+    remove_params_from_json(args.input, args.param_id, output_path, pretty=not args.compact)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,209 @@
+"""
+rules_json_core.py — Rules JSON reading and writing shared by update_*.py and remove_parameter.py
+
+The scripts keep their own rule edits; this module owns the I/O either side of them,
+plus the small helpers (--parametertype_id parsing, --only-missing checks) they share.
+The CSV exporters borrow has_non_finite for their own orjson writers.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+# orjson is imported on first use rather than at startup; see _orjson
+_UNSET: Any = object()
+_orjson_module: Any = _UNSET
+
+
+# Every ASCII digit -> "0", every other byte -> " "; see _has_long_digit_run
+_DIGIT_MASK = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+
+# Bytes translated per step of _has_long_digit_run
+_SCAN_CHUNK = 1 << 20
+
+
+def _orjson() -> Any:
+    """
+    The orjson module, or None if it isn't installed. Imported on the first call,
+    so a script that fails on its arguments never pays for the import.
+    """
+    global _orjson_module
+    if _orjson_module is _UNSET:
+        try:
+            import orjson
+        except ImportError:  # optional: stdlib json reads and writes the same documents, just slower
+            orjson = None
+        _orjson_module = orjson
+    return _orjson_module
+
+
+def _has_long_digit_run(buf: Union[bytes, mmap.mmap]) -> bool:
+    """
+    True if buf holds 19+ digits in a row: a number that may not fit in 64 bits,
+    which orjson would silently read back as a float. Chunks overlap by 18 bytes,
+    so a run can't hide across a chunk boundary.
+    """
+    run = b"0" * 19
+    for start in range(0, len(buf), _SCAN_CHUNK):
+        if run in buf[start:start + _SCAN_CHUNK + 18].translate(_DIGIT_MASK):
+            return True
+    return False
+
+
+def has_non_finite(obj: Any) -> bool:
+    """
+    True if obj holds a NaN or +/-Infinity float anywhere. orjson would write those
+    as null, so the writers below hand such payloads to stdlib json, which keeps them.
+    """
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        t = type(cur)
+        if t is dict:
+            stack.extend(cur.values())
+        elif t is list:
+            stack.extend(cur)
+        elif t is float and not math.isfinite(cur):
+            return True
+    return False
+
+
+def load_json(path: Union[str, Path]) -> Any:
+    """
+    Parse a UTF-8 JSON file. With orjson installed the file is memory-mapped and
+    parsed in place, without first reading a copy of it.
+    """
+    orjson = _orjson()
+    with open(path, "rb") as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                if not _has_long_digit_run(mm):
+                    with memoryview(mm) as view:
+                        try:
+                            return orjson.loads(view)
+                        except orjson.JSONDecodeError:
+                            pass  # e.g. NaN/Infinity literals, which stdlib json still accepts (and real errors, re-raised below)
+        raw = f.read()
+    return json.loads(raw.decode("utf-8"))
+
+
+def write_json(
+    payload: Any, path: Union[str, Path], *, trailing_newline: bool = True, pretty: bool = True
+) -> None:
+    """
+    Write payload as UTF-8 JSON in a single write: 2-space indented, or compact when
+    pretty is False. orjson does the encoding when installed, except for payloads
+    holding NaN/Infinity, which stdlib json writes as before.
+    """
+    data: Optional[bytes] = None
+    orjson = _orjson()
+    if orjson is not None and not has_non_finite(payload):
+        option = (orjson.OPT_INDENT_2 if pretty else 0) | (orjson.OPT_APPEND_NEWLINE if trailing_newline else 0)
+        try:
+            data = orjson.dumps(payload, option=option)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits, which stdlib json still handles
+    if data is None:
+        if pretty:
+            text = json.dumps(payload, ensure_ascii=False, indent=2)
+        else:
+            # no indent: stdlib json's C encoder does the whole document
+            text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        data = (text + "\n" if trailing_newline else text).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _encode_item(item: Any, pretty: bool, orjson: Any) -> bytes:
+    """One list item as JSON bytes, 2-space indented or compact (orjson: the module or None)."""
+    if orjson is not None and not has_non_finite(item):
+        try:
+            return orjson.dumps(item, option=orjson.OPT_INDENT_2) if pretty else orjson.dumps(item)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits, which stdlib json still handles
+    if pretty:
+        return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_rules_stream(rule_lists: Iterable[List[Any]], path: Union[str, Path], *, pretty: bool = True) -> None:
+    """
+    Write {"rules": [...]} from rule lists produced one at a time (e.g. one per input
+    file), laid out as write_json lays out the whole document, so only the list
+    being written has to be in memory. The file is built beside path and moved into
+    place at the end: if producing a list fails, path is left as it was.
+    """
+    if pretty:
+        # each item sits two levels deep: its own lines move right by 4
+        head, first_sep, sep, empty_tail, tail = b'{\n  "rules": [', b"\n    ", b",\n    ", b"]\n}\n", b"\n  ]\n}\n"
+    else:
+        head, first_sep, sep, empty_tail, tail = b'{"rules":[', b"", b",", b"]}\n", b"]}\n"
+
+    orjson = _orjson()
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=1 << 20) as f:
+            f.write(head)
+            item_sep = first_sep
+            for rules in rule_lists:
+                for item in rules:
+                    f.write(item_sep)
+                    data = _encode_item(item, pretty, orjson)
+                    f.write(data.replace(b"\n", b"\n    ") if pretty else data)
+                    item_sep = sep
+            f.write(empty_tail if item_sep is first_sep else tail)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_rules(path: Union[str, Path]) -> Dict[str, Any]:
+    """Load a Rules JSON file and ensure it has a top-level 'rules' list."""
+    data: Dict[str, Any] = load_json(path)
+    if "rules" not in data or not isinstance(data["rules"], list):
+        raise ValueError(f"Input JSON '{path}' does not have a top-level 'rules' list.")
+    return data
+
+
+def save_rules(data: Dict[str, Any], out_path: Path, pretty: bool = True) -> None:
+    """Write the modified Rules JSON to disk (indented unless pretty=False), creating parent dirs if needed."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(data, out_path, pretty=pretty)
+
+
+def parse_param_ids(values: Optional[Iterable[str]]) -> Optional[Set[int]]:
+    """The --parametertype_id values as ints, or None when none were given."""
+    if not values:
+        return None
+    out: Set[int] = set()
+    for v in values:
+        v = v.strip()
+        if v:
+            out.add(int(v))
+    return out if out else None
+
+
+# Values --only-missing treats as missing without needing strip()/lower()
+_MISSING_STRS = frozenset(("", "null", "NULL", "Null"))
+
+
+def is_missing(value: Any) -> bool:
+    """None, or a string that is empty or 'null' (any case) once stripped."""
+    if value is None:
+        return True
+    if type(value) is not str:
+        return False
+    if value in _MISSING_STRS:
+        return True
+    s = value.strip()
+    # only a 4-character string can lowercase to "null"
+    return not s or (len(s) == 4 and s.lower() == "null")
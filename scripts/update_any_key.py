@@ -4,7 +4,9 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from rules_json_core import is_missing, load_json, parse_param_ids, save_rules
 
 
 Json = Dict[str, Any]
@@ -18,14 +20,43 @@ def _split_path(path: str) -> List[str]:
 
 
 def get_by_path(obj: Any, path: Sequence[str]) -> Any:
+    # parsed JSON objects are plain dicts: one exact type check and one .get() per step
     cur = obj
     for key in path:
-        if not isinstance(cur, dict) or key not in cur:
+        if type(cur) is not dict:
             return None
-        cur = cur[key]
+        cur = cur.get(key)
     return cur
 
 
+def compile_getter(path: Sequence[str]) -> Callable[[Any], Any]:
+    """
+    get_by_path with the path fixed up front. The usual 1- and 2-key paths
+    ('action', 'data.spec_id') get a closure with the keys bound and no loop.
+    """
+    if len(path) == 1:
+        (key,) = path
+
+        def get_one(obj: Any) -> Any:
+            return obj.get(key) if type(obj) is dict else None
+
+        return get_one
+
+    if len(path) == 2:
+        outer, inner = path
+
+        def get_two(obj: Any) -> Any:
+            if type(obj) is not dict:
+                return None
+            cur = obj.get(outer)
+            return cur.get(inner) if type(cur) is dict else None
+
+        return get_two
+
+    keys = tuple(path)
+    return lambda obj: get_by_path(obj, keys)
+
+
 def set_by_path(obj: Dict[str, Any], path: Sequence[str], value: Any) -> None:
     cur: Dict[str, Any] = obj
     for key in path[:-1]:
@@ -86,24 +117,15 @@ def parse_value(raw: str, as_type: str) -> Any:
 
 
 # -------------------- Param filter (common need) --------------------
-def parse_param_ids(values: Optional[Iterable[str]]) -> Optional[Set[int]]:
-    if not values:
-        return None
-    out: Set[int] = set()
-    for v in values:
-        v = v.strip()
-        if v:
-            out.add(int(v))
-    return out if out else None
-
-
 def param_id_matches(item: Dict[str, Any], restrict_ids: Optional[Set[int]]) -> bool:
     if restrict_ids is None:
         return True
     data = item.get("data")
-    if not isinstance(data, dict):
+    if type(data) is not dict:
         return False
     pid = data.get("parametertype_id")
+    if type(pid) is int:
+        return pid in restrict_ids
     try:
         return int(pid) in restrict_ids
     except Exception:
@@ -129,18 +151,16 @@ def update_key_for_rules(
         raise ValueError("Input JSON must have top-level 'rules' list.")
 
     path = _split_path(key_path)
+    get_current = compile_getter(path)
     updated = 0
     for item in rules:
-        if not isinstance(item, dict):
+        if type(item) is not dict:
             continue
         if not param_id_matches(item, restrict_param_ids):
             continue
 
-        current = get_by_path(item, path)
-        if only_missing:
-            missing = (current is None) or (isinstance(current, str) and current.strip().lower() in ("", "null"))
-            if not missing:
-                continue
+        if only_missing and not is_missing(get_current(item)):
+            continue
 
         set_by_path(item, path, new_value)
         updated += 1
@@ -149,18 +169,6 @@ def update_key_for_rules(
 
 
 # -------------------- I/O --------------------
-def load_rules(path: Path) -> Json:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save_rules(data: Json, out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-
 def default_out_path(in_path: Path, key_path: str, value_label: str) -> Path:
     stem = in_path.stem  # e.g., Rules_20251105
     safe_key = key_path.replace(".", "_")
@@ -195,6 +203,7 @@ def main() -> None:
     )
     p.add_argument("--out", dest="out_path", default=None, help="Output JSON path.")
     p.add_argument("--inplace", action="store_true", help="Overwrite the input file (mutually exclusive with --out).")
+    p.add_argument("--compact", action="store_true", help="Write compact JSON instead of indented (much faster without orjson)")
 
     args = p.parse_args()
 
@@ -206,7 +215,7 @@ def main() -> None:
         raise SystemExit("Use either --inplace or --out, not both.")
 
     new_val = parse_value(args.value, args.as_type)
-    data = load_rules(in_path)
+    data = load_json(in_path)
 
     restrict_ids = parse_param_ids(args.parametertype_id)
     updated, total = update_key_for_rules(
@@ -227,7 +236,7 @@ def main() -> None:
             # For label, reuse the raw --value to make it readable in filename
             out_path = default_out_path(in_path, args.key, str(args.value))
 
-    save_rules(data, out_path)
+    save_rules(data, out_path, pretty=not args.compact)
 
     print(f"Total rules: {total}")
     print(f"Updated '{args.key}' in: {updated} rules")
@@ -2,18 +2,13 @@
 from __future__ import annotations
 
 import argparse
-import json
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-
-def load_rules(path: Path) -> Dict[str, Any]:
-    """Load a Rules JSON file and ensure it has a top-level 'rules' list."""
-    with path.open("r", encoding="utf-8") as f:
-        data: Dict[str, Any] = json.load(f)
-    if "rules" not in data or not isinstance(data["rules"], list):
-        raise ValueError(f"Input JSON '{path}' does not have a top-level 'rules' list.")
-    return data
+from rules_json_core import load_rules, save_rules, write_rules_stream
 
 
 def update_spec_id(data: Dict[str, Any], new_spec_id: int) -> Tuple[int, int]:
@@ -25,23 +20,36 @@ def update_spec_id(data: Dict[str, Any], new_spec_id: int) -> Tuple[int, int]:
     (updated_count, total_rules)
     """
     rules: List[Any] = data.get("rules", [])
+    spec_id: int = int(new_spec_id)  # coerced once, not per rule
     updated: int = 0
     for item in rules:
         if not isinstance(item, dict):
             continue
         d = item.get("data")
         if isinstance(d, dict):
-            d["spec_id"] = int(new_spec_id)
+            d["spec_id"] = spec_id
             updated += 1
     return updated, len(rules)
 
 
-def save_rules(data: Dict[str, Any], out_path: Path) -> None:
-    """Write the modified Rules JSON to disk, creating parent dirs if needed."""
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+def process_file(in_path: Path, out_path: Path, new_spec_id: int, pretty: bool = True) -> Tuple[int, int]:
+    """Load one Rules file, set its spec_id and save it (per-file mode)."""
+    data: Dict[str, Any] = load_rules(in_path)
+    updated, total = update_spec_id(data, new_spec_id)
+    save_rules(data, out_path, pretty)
+    return updated, total
+
+
+def jobs_are_independent(jobs: List[Tuple[Path, Path]]) -> bool:
+    """
+    True if the (input, output) jobs can run in any order: no two write the same
+    file and none writes another job's input.
+    """
+    ins = [in_path.resolve() for in_path, _ in jobs]
+    outs = [out_path.resolve() for _, out_path in jobs]
+    if len(set(outs)) != len(outs):
+        return False
+    return all(out == own_in or out not in ins for own_in, out in zip(ins, outs))
 
 
 def default_out_path(in_path: Path, new_spec_id: int) -> Path:
@@ -67,7 +75,9 @@ def main() -> None:
         required=True,
         help=(
             "Path(s) to input Rules JSON file(s) "
-            "(e.g., Rules_20251105.json other_rules.json ...)"
+            "(e.g., Rules_20251105.json other_rules.json ...). "
+            "Without --out, several files are processed in parallel: if one fails, "
+            "files the workers had already picked up may still be written."
         ),
     )
     parser.add_argument(
@@ -91,10 +101,16 @@ def main() -> None:
         action="store_true",
         help="Overwrite each input file in place (mutually exclusive with --out).",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON instead of indented (much faster without orjson)",
+    )
     args = parser.parse_args()
 
     in_paths_raw: List[str] = args.in_paths
     new_spec_id: int = args.spec_id
+    pretty: bool = not args.compact
 
     if args.inplace and args.out_path is not None:
         raise SystemExit("Use either --inplace OR --out, not both.")
@@ -113,25 +129,26 @@ def main() -> None:
 
     if merge_to_single_output:
         # MODE: multiple inputs, single merged output JSON
-        combined_rules: List[Any] = []
+        # (each file's rules are written out before the next file is read)
+        def updated_rule_lists() -> Iterator[List[Any]]:
+            nonlocal total_files, grand_total_rules, grand_total_updated
+            for in_path in in_paths:
+                data: Dict[str, Any] = load_rules(in_path)
+                updated, total = update_spec_id(data, new_spec_id)
 
-        for in_path in in_paths:
-            data: Dict[str, Any] = load_rules(in_path)
-            updated, total = update_spec_id(data, new_spec_id)
-            rules_list: List[Any] = data.get("rules", [])
-            combined_rules.extend(rules_list)
+                total_files += 1
+                grand_total_rules += total
+                grand_total_updated += updated
 
-            total_files += 1
-            grand_total_rules += total
-            grand_total_updated += updated
+                print(f"[{in_path}]")
+                print(f"  Total rules: {total}")
+                print(f"  Updated spec_id in: {updated} rules")
 
-            print(f"[{in_path}]")
-            print(f"  Total rules: {total}")
-            print(f"  Updated spec_id in: {updated} rules")
+                yield data.get("rules", [])
 
         out_path: Path = Path(args.out_path)
-        combined_data: Dict[str, Any] = {"rules": combined_rules}
-        save_rules(combined_data, out_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        write_rules_stream(updated_rule_lists(), out_path, pretty=pretty)
 
         print(f"\nMerged output written to: {out_path}")
         print("Summary:")
@@ -141,6 +158,7 @@ def main() -> None:
 
     else:
         # MODE: per-file processing (single input OR multiple inputs without merge)
+        jobs: List[Tuple[Path, Path]] = []
         for in_path in in_paths:
             if args.inplace:
                 out_path = in_path
@@ -151,18 +169,32 @@ def main() -> None:
                 else:
                     # default per-file output
                     out_path = default_out_path(in_path, new_spec_id)
-
-            data = load_rules(in_path)
-            updated, total = update_spec_id(data, new_spec_id)
-            save_rules(data, out_path)
-
-            total_files += 1
-            grand_total_rules += total
-            grand_total_updated += updated
-
-            print(f"[{in_path}] -> [{out_path}]")
-            print(f"  Total rules: {total}")
-            print(f"  Updated spec_id in: {updated} rules")
+            jobs.append((in_path, out_path))
+
+        results: Iterable[Tuple[int, int]]
+        pool: Optional[ProcessPoolExecutor] = None
+        workers: int = min(len(jobs), os.cpu_count() or 1)
+        if workers > 1 and jobs_are_independent(jobs):
+            # files don't depend on each other: one process per file, up to the core count
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(process_file, *zip(*jobs), itertools.repeat(new_spec_id), itertools.repeat(pretty))
+        else:
+            results = (process_file(in_path, out_path, new_spec_id, pretty) for in_path, out_path in jobs)
+
+        try:
+            # reported in input order, each as soon as it (and every file before it) is done
+            for (in_path, out_path), (updated, total) in zip(jobs, results):
+                total_files += 1
+                grand_total_rules += total
+                grand_total_updated += updated
+
+                print(f"[{in_path}] -> [{out_path}]")
+                print(f"  Total rules: {total}")
+                print(f"  Updated spec_id in: {updated} rules")
+        finally:
+            if pool is not None:
+                # after a failure, files not yet handed to a worker are dropped; the rest still finish
+                pool.shutdown(cancel_futures=True)
 
         print("\nSummary:")
         print(f"  Files processed: {total_files}")
@@ -2,28 +2,10 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-
-def load_rules(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        data: Dict[str, Any] = json.load(f)
-    if "rules" not in data or not isinstance(data["rules"], list):
-        raise ValueError("Input JSON does not have a top-level 'rules' list.")
-    return data
-
-
-def parse_param_ids(values: Optional[Iterable[str]]) -> Optional[Set[int]]:
-    if not values:
-        return None
-    out: Set[int] = set()
-    for v in values:
-        v = v.strip()
-        if v:
-            out.add(int(v))
-    return out if out else None
+from rules_json_core import is_missing, load_rules, parse_param_ids, save_rules
 
 
 def update_unit(
@@ -54,29 +36,28 @@ def update_unit(
     rules: List[Any] = data.get("rules", [])
     updated = 0
     for item in rules:
-        if not isinstance(item, dict):
+        # parsed JSON objects are plain dicts, so an exact type check is enough
+        if type(item) is not dict:
             continue
         d = item.get("data")
-        if not isinstance(d, dict):
+        if type(d) is not dict:
             continue
 
         # Filter by parametertype_id if requested
         if restrict_param_ids is not None:
             pid = d.get("parametertype_id")
-            try:
-                pid_int = int(pid)
-            except Exception:
-                # Skip if pid is missing or not an int
-                continue
-            if pid_int not in restrict_param_ids:
+            if type(pid) is not int:
+                # "101", 101.0, ...: coerce; skip if pid is missing or not an int
+                try:
+                    pid = int(pid)
+                except Exception:
+                    continue
+            if pid not in restrict_param_ids:
                 continue
 
-        current = d.get("DDF_unit")
-        if only_missing:
-            # Treat "", "null" (string), and None as missing
-            missing = (current is None) or (isinstance(current, str) and current.strip().lower() in ("", "null"))
-            if not missing:
-                continue
+        # Treat "", "null" (string), and None as missing
+        if only_missing and not is_missing(d.get("DDF_unit")):
+            continue
 
         d["DDF_unit"] = new_unit  # can be None (-> JSON null)
         updated += 1
@@ -84,13 +65,6 @@ def update_unit(
     return updated, len(rules)
 
 
-def save_rules(data: Dict[str, Any], out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-
 def default_out_path(in_path: Path, label: str) -> Path:
     stem = in_path.stem  # e.g., Rules_20251105
     return in_path.with_name(f"{stem}_{label}.json")
@@ -142,6 +116,11 @@ def main() -> None:
         action="store_true",
         help="Overwrite the input file in place (mutually exclusive with --out).",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON instead of indented (much faster without orjson)",
+    )
 
     args = parser.parse_args()
 
@@ -178,7 +157,7 @@ def main() -> None:
         only_missing=bool(args.only_missing),
         restrict_param_ids=restrict_ids,
     )
-    save_rules(data, out_path)
+    save_rules(data, out_path, pretty=not args.compact)
 
     print(f"Total rules: {total}")
     print(f"Updated DDF_unit in: {updated} rules")